@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.records import compact_results, parse_dates
+from src.utils import DEFAULT_CHUNK_SIZE, add_predictions, predict_batch, prepare_profile
+
+# Columns carried through from the input when present
+PASSTHROUGH_COLUMNS = ['id', 'date']
+
+def read_batches(source, fmt=None, text_column='text', batch_size=5000):
+    """
+    Streams the input as DataFrames of at most batch_size rows with a 'text' column.
+    source: path or '-' for stdin. fmt: 'csv', 'jsonl' or 'lines' (inferred from the extension;
+    stdin defaults to 'lines', one tweet per line).
+    """
+    if fmt is None:
+        ext = os.path.splitext(source)[1].lower()
+        fmt = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl'}.get(ext, 'lines')
+
+    handle = sys.stdin if source == '-' else source
+    if fmt == 'csv':
+        reader = pd.read_csv(handle, chunksize=batch_size)
+    elif fmt == 'jsonl':
+        reader = pd.read_json(handle, lines=True, chunksize=batch_size)
+    elif fmt == 'lines':
+        reader = _read_lines(handle, batch_size)
+    else:
+        raise ValueError(f"Unknown input format '{fmt}'")
+
+    for chunk in reader:
+        if text_column not in chunk.columns:
+            # Raw dataset CSVs use 'statement' for the text
+            if 'statement' in chunk.columns:
+                text_column = 'statement'
+            else:
+                raise ValueError(f"Input has no '{text_column}' column. Found: {chunk.columns.tolist()}")
+        keep = [text_column] + [c for c in PASSTHROUGH_COLUMNS if c in chunk.columns and c != text_column]
+        chunk = chunk[keep].rename(columns={text_column: 'text'})
+        yield chunk.dropna(subset=['text'])
+
+def _read_lines(handle, batch_size):
+    f = open(handle, 'r', encoding='utf-8') if isinstance(handle, str) else handle
+    try:
+        batch = []
+        for line in f:
+            line = line.strip()
+            if line:
+                batch.append(line)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame({'text': batch})
+                batch = []
+        if batch:
+            yield pd.DataFrame({'text': batch})
+    finally:
+        if f is not handle:
+            f.close()
+
+class ResultWriter:
+    """
+    Appends result frames to JSONL (path or '-' for stdout) or Parquet, one batch at a time.
+    """
+    def __init__(self, path, fmt=None):
+        self.path = path
+        if fmt is None:
+            fmt = 'parquet' if path.endswith('.parquet') else 'jsonl'
+        self.fmt = fmt
+        self._parquet = None
+        self._schema = None
+        if fmt == 'jsonl':
+            self._file = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8')
+        elif fmt == 'parquet':
+            import pyarrow.parquet # Optional dependency, only needed for Parquet output
+            self._pq = pyarrow.parquet
+        else:
+            raise ValueError(f"Unknown output format '{fmt}'")
+        self.rows = 0
+
+    def write(self, df):
+        if df.empty:
+            return
+        self.rows += len(df)
+        if self.fmt == 'jsonl':
+            # Missing values (NaN/NaT) become null rather than invalid JSON
+            for record in df.astype(object).where(df.notna(), None).to_dict(orient='records'):
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+            return
+
+        import pyarrow as pa
+        # Dates and ids stay typed (timestamp/int64 columns); a chunk without any parseable
+        # date comes out of compact_results as text, so make it an all-null timestamp column
+        if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+            df = df.assign(date=parse_dates(df['date'].to_numpy()).to_numpy())
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        if self._parquet is None:
+            self._schema = table.schema
+            self._parquet = self._pq.ParquetWriter(self.path, self._schema)
+        self._parquet.write_table(table)
+
+    def close(self):
+        if self.fmt == 'jsonl' and self._file is not sys.stdout:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+# --- Worker process state: the model is loaded once per worker ---
+_worker_model = None
+
+def _init_worker():
+    global _worker_model
+    sys.stdout = sys.stderr # Keep log prints out of a JSONL stream on stdout
+    from src.model_registry import ModelRegistry
+    _worker_model = ModelRegistry().get()
+    if _worker_model is None:
+        raise RuntimeError("Model not found")
+
+def _classify(texts, chunk_size=DEFAULT_CHUNK_SIZE):
+    predictions, probabilities = predict_batch(texts, _worker_model, chunk_size)
+    return predictions.tolist(), probabilities.tolist()
+
+def run(source, output, input_format=None, output_format=None, text_column='text', batch_size=5000,
+        workers=None, max_in_flight=None, keep_intermediate=False):
+    """
+    Streams source -> clean/translate (main process) -> classify (process pool) -> output.
+    At most max_in_flight batches are queued for classification; results are written
+    in input order as soon as the oldest batch is done.
+    keep_intermediate: also write the 'language', 'cleaned_text' and 'translated_text' columns.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    writer = ResultWriter(output, output_format)
+    pending = deque()
+    start = time.time()
+    read = 0
+
+    def flush_oldest():
+        prepared, future = pending.popleft()
+        predictions, probabilities = future.result()
+        writer.write(compact_results(add_predictions(prepared, predictions, probabilities), keep_intermediate))
+
+    try:
+        # The writer already holds the real stdout; log prints along the way go to stderr
+        with contextlib.redirect_stdout(sys.stderr), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for batch in read_batches(source, input_format, text_column, batch_size):
+                read += len(batch)
+                prepared = prepare_profile(batch)
+                if prepared.empty:
+                    continue
+                pending.append((prepared, pool.submit(_classify, prepared['cleaned_text'].tolist())))
+                # Backpressure: bound memory by waiting on the oldest batch
+                while len(pending) >= max_in_flight:
+                    flush_oldest()
+                print(f"Read {read} tweets, wrote {writer.rows} ({read / (time.time() - start):,.0f} tweets/s)",
+                      file=sys.stderr)
+            while pending:
+                flush_oldest()
+    finally:
+        writer.close()
+
+    print(f"Done: {read} tweets read, {writer.rows} results in {time.time() - start:.1f}s", file=sys.stderr)
+    return writer.rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bulk analysis: clean -> translate -> classify.")
+    parser.add_argument("input", help="CSV/JSONL/text file, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output .jsonl/.parquet path, or '-' for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl", "lines"])
+    parser.add_argument("--output-format", choices=["jsonl", "parquet"])
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, help="Classifier processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, help="Batches queued at once (default: 2 x workers)")
+    parser.add_argument("--keep-intermediate", action="store_true",
+                        help="Also write language, cleaned and translated text")
+    args = parser.parse_args()
+
+    run(args.input, args.output, args.input_format, args.output_format, args.text_column,
+        args.batch_size, args.workers, args.max_in_flight, args.keep_intermediate)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import os
+import threading
+import time
+from src.checkpoints import DEFAULT_CHECKPOINT_DIR, CheckpointStore
+from src.pipeline import scan_profile_incremental
+from src.risk_scoring import ProfileAggregator
+from src.scraper import login_client, scrape_profile_with_login
+from src.utils import analyze_profile
+
+class TokenBucket:
+    """
+    Async token bucket: at most `rate` requests per second on average,
+    with bursts of up to `capacity`. pause() blocks everyone until a given time,
+    used when the API reports a rate-limit window.
+    """
+    def __init__(self, rate=1.0, capacity=5):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class ClientPool:
+    """
+    Small pool of authenticated clients, created once and shared by all scans.
+    A twikit Client serves concurrent requests, so clients aren't checked out: get()
+    hands them out round-robin and any number of scans can use one at the same time.
+    The scan semaphore and the rate limiter are what bound the load.
+    client_factory: async callable returning a client (default: login_client)
+    """
+    def __init__(self, size=1, auth_info=None, cookies_path=None, client_factory=None):
+        self.size = size
+        self.auth_info = auth_info
+        self.cookies_path = cookies_path
+        self.client_factory = client_factory or (lambda: login_client(auth_info, cookies_path))
+        self._clients = None
+        self._next = 0
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        # Clients are only published once every one logged in; after a failed
+        # login the next get() tries again
+        async with self._start_lock:
+            if self._clients is None:
+                self._clients = list(await asyncio.gather(*(self.client_factory() for _ in range(self.size))))
+        return self
+
+    async def get(self):
+        await self.start()
+        client = self._clients[self._next % len(self._clients)]
+        self._next += 1
+        return client
+
+async def scrape_profiles(usernames, pool, concurrency=4, rate_limiter=None, target_count=200,
+                          on_result=None, model=None, store=None):
+    """
+    Scrapes many profiles concurrently with a shared client pool.
+    At most `concurrency` profiles are in flight; on_result(username, df) is called
+    as soon as each one finishes (df is None on failure).
+    With a CheckpointStore (and model), only new tweets are fetched and analyzed,
+    and df is the merged analyzed history.
+    Returns a dict username -> DataFrame (or None).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def fetch(username):
+        async with semaphore:
+            client = await pool.get()
+            if store is not None:
+                df, _ = await scan_profile_incremental(
+                    username, model, store, target_count=target_count,
+                    client=client, rate_limiter=rate_limiter, class_probabilities=True
+                )
+                return df
+            return await scrape_profile_with_login(
+                username, target_count=target_count, client=client, rate_limiter=rate_limiter
+            )
+
+    async def scan(username):
+        # One failing profile (scrape, checkpoint, analysis or write) must not abort the batch
+        try:
+            df = await fetch(username)
+        except Exception as e:
+            print(f"@{username}: scan failed: {e}")
+            df = None
+        results[username] = df
+        if on_result:
+            try:
+                # Writing/analysis runs off the event loop so other scans keep going
+                await asyncio.to_thread(on_result, username, df)
+            except Exception as e:
+                print(f"@{username}: handling result failed: {e}")
+                results[username] = None
+
+    await asyncio.gather(*(scan(username) for username in usernames))
+    return results
+
+def write_result(output_dir, username, df):
+    """
+    Writes one profile's tweets to output_dir/<username>.csv.
+    """
+    if df is None:
+        print(f"@{username}: scrape failed")
+        return None
+    path = os.path.join(output_dir, f"{username}.csv")
+    df.to_csv(path, index=False)
+    print(f"@{username}: {len(df)} rows -> {path}")
+    return path
+
+def run_batch(usernames, auth_info=None, cookies_path=None, output_dir="results", concurrency=4,
+              pool_size=1, rate=1.0, burst=5, target_count=200, model=None, client_factory=None,
+              incremental=False, checkpoint_dir=None):
+    """
+    Sync entry point: scrape (and optionally analyze) a list of usernames,
+    writing output_dir/<username>.csv as each profile finishes. With a model, a per-profile
+    risk summary (src.risk_scoring) is written to output_dir/summary.csv at the end.
+    incremental: resume from per-user checkpoints (requires model)
+    """
+    if incremental and model is None:
+        raise ValueError("Incremental scans need a model to analyze new tweets")
+    store = CheckpointStore(checkpoint_dir or DEFAULT_CHECKPOINT_DIR) if incremental else None
+    os.makedirs(output_dir, exist_ok=True)
+    usernames = list(dict.fromkeys(u.replace("@", "").strip() for u in usernames if u.strip()))
+
+    # Per-profile risk statistics, folded in as each profile finishes
+    aggregator = ProfileAggregator(by='username')
+    aggregator_lock = threading.Lock() # on_result runs in worker threads
+
+    def on_result(username, df):
+        # Incremental results come back already analyzed
+        if model is not None and not incremental and df is not None and not df.empty:
+            df = analyze_profile(df, model, class_probabilities=True)
+        path = write_result(output_dir, username, df)
+        if model is not None and df is not None and not df.empty:
+            with aggregator_lock:
+                aggregator.update(df.assign(username=username))
+        return path
+
+    async def main():
+        pool = ClientPool(pool_size, auth_info, cookies_path, client_factory)
+        bucket = TokenBucket(rate, burst)
+        return await scrape_profiles(
+            usernames, pool, concurrency, bucket, target_count,
+            on_result=on_result, model=model, store=store
+        )
+
+    results = asyncio.run(main())
+    summary = aggregator.stats()
+    if not summary.empty:
+        path = os.path.join(output_dir, "summary.csv")
+        summary.sort_values('risk_score', ascending=False).to_csv(path)
+        print(f"Risk summary for {len(summary)} profiles -> {path}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape many X profiles with a shared session.")
+    parser.add_argument("usernames", nargs="*", help="Profiles to scan")
+    parser.add_argument("--users-file", help="File with one username per line")
+    parser.add_argument("--cookies", default="cookies.json", help="Path to cookies.json")
+    parser.add_argument("--output-dir", default="results")
+    parser.add_argument("--concurrency", type=int, default=4, help="Profiles scanned at once")
+    parser.add_argument("--pool-size", type=int, default=1, help="Authenticated clients, used round-robin (each serves concurrent scans)")
+    parser.add_argument("--rate", type=float, default=1.0, help="API requests per second")
+    parser.add_argument("--burst", type=int, default=5, help="Token bucket capacity")
+    parser.add_argument("--count", type=int, default=200, help="Tweets per profile")
+    parser.add_argument("--analyze", action="store_true", help="Classify tweets before writing")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch tweets newer than the last scan (implies --analyze)")
+    parser.add_argument("--checkpoint-dir", help="Where incremental checkpoints are stored")
+    parser.add_argument("--fake", action="store_true", help="Use the offline fake client")
+    args = parser.parse_args()
+
+    usernames = list(args.usernames)
+    if args.users_file:
+        with open(args.users_file, 'r', encoding='utf-8') as f:
+            usernames.extend(line.strip() for line in f if line.strip())
+    if not usernames:
+        parser.error("No usernames given")
+
+    model = None
+    if args.analyze or args.incremental:
+        import joblib
+        model = joblib.load("models/mental_health_model.pkl")
+
+    client_factory = None
+    if args.fake:
+        from src.fake_twikit import FakeClient
+        async def client_factory():
+            return FakeClient()
+
+    start = time.time()
+    results = run_batch(
+        usernames, cookies_path=args.cookies, output_dir=args.output_dir,
+        concurrency=args.concurrency, pool_size=args.pool_size, rate=args.rate,
+        burst=args.burst, target_count=args.count, model=model, client_factory=client_factory,
+        incremental=args.incremental, checkpoint_dir=args.checkpoint_dir
+    )
+    ok = sum(df is not None for df in results.values())
+    print(f"Scanned {ok}/{len(results)} profiles in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import sklearn
+from src.fake_twikit import FakeClient
+from src.fast_model import DEFAULT_ARTIFACT_DIR, MANIFEST_FILE
+from src.model_registry import DEFAULT_MODEL_PATH, ModelRegistry
+from src.model_train import build_pipeline
+from src.pipeline import analyze_pages
+from src.scraper import iter_tweet_pages
+from src.text_normalizer import clean_series, clean_text
+from src.translation_cache import TranslationCache, get_translation_cache, set_translation_cache
+from src.translator import FakeBackend, get_backend, set_backend
+from src.utils import analyze_profile, translate_text
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_LANGUAGE_MIXES = ["en", "en,pt,es"]
+DEFAULT_OUTPUT = "reports/benchmark.json"
+DEFAULT_BASELINE = "reports/benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.15 # Relative change that counts as a regression
+STAGES = ['clean_text', 'translate_text', 'analyze_profile', 'profile_scan', 'model_load', 'training']
+
+# Label -> words as (en, pt, es). Synthetic tweets mix these with function words of their
+# language, so the language gate, the fake translator and the classifier all have work to do.
+LEXICON = {
+    'Depression': [('empty', 'vazio', 'vacío'), ('tired', 'cansado', 'cansado'), ('alone', 'sozinho', 'solo'),
+                   ('crying', 'chorando', 'llorando'), ('hopeless', 'desesperado', 'desesperado'),
+                   ('sad', 'triste', 'triste'), ('worthless', 'inútil', 'inútil')],
+    'Anxiety': [('worried', 'preocupado', 'preocupado'), ('panic', 'pânico', 'pánico'),
+                ('nervous', 'nervoso', 'nervioso'), ('scared', 'assustado', 'asustado'),
+                ('racing', 'acelerado', 'acelerado'), ('breathe', 'respirar', 'respirar')],
+    'Stress': [('deadline', 'prazo', 'plazo'), ('work', 'trabalho', 'trabajo'), ('pressure', 'pressão', 'presión'),
+               ('exhausted', 'exausto', 'agotado'), ('busy', 'ocupado', 'ocupado'), ('boss', 'chefe', 'jefe')],
+    'Normal': [('beach', 'praia', 'playa'), ('friends', 'amigos', 'amigos'), ('happy', 'feliz', 'feliz'),
+               ('coffee', 'café', 'café'), ('great', 'ótimo', 'genial'), ('music', 'música', 'música'),
+               ('dinner', 'jantar', 'cena')],
+}
+LANGUAGE_INDEX = {'en': 0, 'pt': 1, 'es': 2}
+FILLER = {
+    'en': ['i', 'feel', 'so', 'the', 'and', 'today', 'my', 'is', 'just', 'with', 'this', 'it'],
+    'pt': ['eu', 'me', 'sinto', 'muito', 'hoje', 'que', 'não', 'com', 'meu', 'isso', 'mas', 'tudo'],
+    'es': ['yo', 'me', 'siento', 'muy', 'hoy', 'que', 'pero', 'con', 'mi', 'el', 'todo', 'porque'],
+}
+NOISE = ['https://t.co/{}', '@user{}', '#tag{}', '😞', '!!!', '...', 'www.example{}.com', '10/10']
+
+def make_corpus(size, languages=('en',), seed=0):
+    """
+    Deterministic synthetic tweets: DataFrame with 'text', 'label' and 'language' columns.
+    """
+    unknown = [lang for lang in languages if lang not in LANGUAGE_INDEX]
+    if unknown:
+        raise ValueError(f"No synthetic vocabulary for {unknown}. Options: {list(LANGUAGE_INDEX)}")
+    rng = random.Random(f"{seed}:{size}:{','.join(languages)}")
+    labels = sorted(LEXICON)
+    rows = []
+    for _ in range(size):
+        label = rng.choice(labels)
+        lang = rng.choice(languages)
+        words = [rng.choice(LEXICON[label])[LANGUAGE_INDEX[lang]] for _ in range(rng.randint(2, 5))]
+        words += rng.sample(FILLER[lang], rng.randint(3, 8))
+        rng.shuffle(words)
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(NOISE).format(rng.randrange(1000)))
+        text = " ".join(words)
+        rows.append((text.capitalize() if rng.random() < 0.5 else text, label, lang))
+    return pd.DataFrame(rows, columns=['text', 'label', 'language'])
+
+def translation_dictionary():
+    """
+    Word-for-word pt/es -> en dictionary for FakeBackend.
+    """
+    dictionary = {}
+    for entries in LEXICON.values():
+        for en, pt, es in entries:
+            dictionary[pt] = en
+            dictionary[es] = en
+    return dictionary
+
+def _percentiles(latencies):
+    if not latencies:
+        return None
+    values = np.percentile(np.asarray(latencies, dtype=float), [50, 95, 99])
+    return {f"p{q}": round(v * 1000, 4) for q, v in zip((50, 95, 99), values)}
+
+def measure(run, items, repeat=3, setup=None):
+    """
+    Times run() repeat times (best wall time wins) and once more under tracemalloc for
+    peak memory. run() may return a list of per-operation latencies in seconds.
+    setup(), if given, runs untimed before every call (e.g. to reset caches).
+    """
+    best, latencies = float('inf'), None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best, latencies = elapsed, result
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'items': items,
+        'seconds': round(best, 6),
+        'items_per_sec': round(items / best, 2) if best > 0 else None,
+        'latency_ms': _percentiles(latencies),
+        'peak_memory_mb': round(peak / 2 ** 20, 3),
+    }
+
+def bench_clean_text(texts, repeat):
+    def run():
+        latencies = []
+        for text in texts:
+            start = time.perf_counter()
+            clean_text(text)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+    return measure(run, len(texts), repeat)
+
+def bench_translate_text(texts, backend, repeat, warm=False):
+    """
+    Per-call translate_text latency through the cache. Cold: every run starts with an
+    empty cache, so each unique text goes to the backend. Warm: all texts are cached.
+    """
+    cache = TranslationCache(None)
+
+    def setup():
+        cache.memory.clear()
+        if warm:
+            for text in texts:
+                translate_text(text, cache=cache, backend=backend)
+
+    def run():
+        latencies = []
+        for text in texts:
+            start = time.perf_counter()
+            translate_text(text, cache=cache, backend=backend)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+    return measure(run, len(texts), repeat, setup)
+
+def bench_analyze_profile(corpus, model, profile_size, repeat):
+    """
+    analyze_profile over the corpus split into profile-sized frames (latency is per profile).
+    """
+    frames = [corpus.iloc[i:i + profile_size][['text']] for i in range(0, len(corpus), profile_size)]
+    cache = get_translation_cache()
+
+    def run():
+        latencies = []
+        for frame in frames:
+            start = time.perf_counter()
+            analyze_profile(frame, model)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+    return measure(run, len(corpus), repeat, setup=cache.memory.clear)
+
+def bench_profile_scan(corpus, model, scrape_latency, repeat):
+    """
+    End to end: FakeClient pages -> analyze_pages (fetch/analyze overlap). Latency is per page.
+    """
+    texts = corpus['text'].tolist()
+    cache = get_translation_cache()
+
+    async def scan():
+        client = FakeClient(tweets_per_user=len(texts), latency=scrape_latency, texts=texts)
+        latencies = []
+        start = time.perf_counter()
+        async for _ in analyze_pages(iter_tweet_pages('benchmark', client=client, target_count=len(texts)), model):
+            now = time.perf_counter()
+            latencies.append(now - start)
+            start = now
+        return latencies
+    return measure(lambda: asyncio.run(scan()), len(texts), repeat, setup=cache.memory.clear)
+
+def bench_model_load(kind, repeat):
+    """
+    Cold loads through ModelRegistry (hashing + loading) of the artifact directory or the pickle.
+    """
+    if kind == 'artifact':
+        if not os.path.exists(os.path.join(DEFAULT_ARTIFACT_DIR, MANIFEST_FILE)):
+            return None
+        artifact_dir = DEFAULT_ARTIFACT_DIR
+    else:
+        if not os.path.exists(DEFAULT_MODEL_PATH):
+            return None
+        artifact_dir = os.path.join(DEFAULT_ARTIFACT_DIR, 'missing') # Forces the pickle fallback
+
+    def run():
+        latencies = []
+        for _ in range(max(repeat, 3)):
+            start = time.perf_counter()
+            ModelRegistry(artifact_dir, DEFAULT_MODEL_PATH).get()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+    return measure(run, max(repeat, 3), repeat=1)
+
+def bench_training(corpus, repeat):
+    """
+    Fits model_train.build_pipeline() (what train_model trains) on the labelled corpus.
+    """
+    cleaned = clean_series(corpus['text'])
+    labels = corpus['label']
+
+    def run():
+        build_pipeline().fit(cleaned, labels)
+    return measure(run, len(corpus), repeat)
+
+@contextlib.contextmanager
+def _quiet():
+    # Pipeline log prints would drown the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def run_benchmarks(sizes=None, language_mixes=None, stages=None, repeat=3, translate_latency=0.002,
+                   scrape_latency=0.005, translate_sample=200, profile_size=200, scan_size=1000, seed=0):
+    """
+    Runs every selected stage on every (size, language mix) corpus, fully offline.
+    Returns {'meta': ..., 'results': {key: metrics}} where key is 'stage/size/languages'
+    (or 'model_load/kind').
+    """
+    sizes = sizes or DEFAULT_SIZES
+    language_mixes = language_mixes or DEFAULT_LANGUAGE_MIXES
+    stages = stages or STAGES
+    backend = FakeBackend(translation_dictionary(), latency=translate_latency, seed=seed)
+    previous_backend = get_backend()
+    # The benchmark never touches the network or the on-disk translation cache
+    set_backend(backend)
+    previous_cache = set_translation_cache(TranslationCache(None))
+
+    results = {}
+    try:
+        model = None
+        if {'analyze_profile', 'profile_scan'} & set(stages):
+            with _quiet():
+                model = ModelRegistry().get()
+            if model is None:
+                print("No model found; skipping analyze_profile and profile_scan.", file=sys.stderr)
+
+        for mix in language_mixes:
+            languages = tuple(mix.split(','))
+            for size in sizes:
+                corpus = make_corpus(size, languages, seed)
+                texts = corpus['text'].tolist()
+                suffix = f"{size}/{'-'.join(languages)}"
+                print(f"Corpus {suffix}...", file=sys.stderr)
+                planned = {
+                    'clean_text': lambda: bench_clean_text(texts, repeat),
+                    'translate_text': lambda: bench_translate_text(texts[:translate_sample], backend, repeat),
+                    'translate_text_cached': lambda: bench_translate_text(texts[:translate_sample], backend, repeat, warm=True),
+                    'analyze_profile': lambda: bench_analyze_profile(corpus, model, profile_size, repeat) if model else None,
+                    'profile_scan': lambda: bench_profile_scan(corpus.head(scan_size), model, scrape_latency, repeat) if model else None,
+                    'training': lambda: bench_training(corpus, 1),
+                }
+                for name, bench in planned.items():
+                    if name.split('_cached')[0] not in stages:
+                        continue
+                    with _quiet():
+                        result = bench()
+                    if result is not None:
+                        results[f"{name}/{suffix}"] = result
+                        print(f"  {name:22s} {format_result(result)}", file=sys.stderr)
+
+        if 'model_load' in stages:
+            for kind in ('artifact', 'pickle'):
+                with _quiet():
+                    result = bench_model_load(kind, repeat)
+                if result is not None:
+                    results[f"model_load/{kind}"] = result
+                    print(f"  model_load/{kind:13s} {format_result(result)}", file=sys.stderr)
+    finally:
+        set_backend(previous_backend)
+        set_translation_cache(previous_cache)
+
+    meta = {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'config': {
+            'sizes': sizes, 'language_mixes': language_mixes, 'repeat': repeat,
+            'translate_latency': translate_latency, 'scrape_latency': scrape_latency,
+            'translate_sample': translate_sample, 'profile_size': profile_size,
+            'scan_size': scan_size, 'seed': seed,
+        },
+    }
+    return {'meta': meta, 'results': results}
+
+def format_result(result):
+    line = f"{result['items_per_sec'] or 0:12,.0f} items/s"
+    if result['latency_ms']:
+        line += f"  p50 {result['latency_ms']['p50']:9.3f}ms  p99 {result['latency_ms']['p99']:9.3f}ms"
+    return line + f"  peak {result['peak_memory_mb']:8.2f}MB"
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Flags results that got worse than the baseline by more than tolerance (relative):
+    lower throughput, higher p95 latency or higher peak memory. Tiny absolute changes
+    (under 0.05ms or 1MB) are ignored as noise. Returns a list of regression dicts.
+    """
+    checks = [
+        # (metric, getter, higher_is_better, minimum absolute change)
+        ('items_per_sec', lambda r: r['items_per_sec'], True, 0),
+        ('p95_ms', lambda r: (r['latency_ms'] or {}).get('p95'), False, 0.05),
+        ('peak_memory_mb', lambda r: r['peak_memory_mb'], False, 1.0),
+    ]
+    regressions = []
+    for key, base in baseline['results'].items():
+        cur = current['results'].get(key)
+        if cur is None:
+            continue
+        for metric, get, higher_is_better, min_delta in checks:
+            old, new = get(base), get(cur)
+            if not old or new is None or abs(new - old) < min_delta:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append({'key': key, 'metric': metric, 'baseline': old, 'current': new,
+                                    'change': round(change, 4)})
+    return regressions
+
+def _write_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark: synthetic tweets, fake X client and translator.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (tweets)")
+    parser.add_argument("--languages", nargs="+", default=DEFAULT_LANGUAGE_MIXES,
+                        help="Language mixes, e.g. en or en,pt,es")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the best one is kept")
+    parser.add_argument("--translate-latency", type=float, default=0.002, help="Fake translator seconds per call")
+    parser.add_argument("--scrape-latency", type=float, default=0.005, help="Fake X client seconds per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's results")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline; exit 1 on regressions")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.languages, args.stages, args.repeat, args.translate_latency,
+                            args.scrape_latency, seed=args.seed)
+    _write_json(args.output, report)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        _write_json(args.baseline, report)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('config') != report['meta']['config']:
+            print("Warning: baseline was recorded with different settings; only matching keys are compared.")
+        if not set(baseline['results']) & set(report['results']):
+            print("Warning: no results in common with the baseline; nothing to compare.")
+        regressions = compare(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['key']} {r['metric']}: {r['baseline']} -> {r['current']} ({r['change']:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
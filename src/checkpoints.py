@@ -0,0 +1,81 @@
+import json
+import os
+import re
+import time
+import pandas as pd
+from src.records import compact_results
+
+DEFAULT_CHECKPOINT_DIR = "cache/checkpoints"
+
+class CheckpointStore:
+    """
+    Per-user scan checkpoints: the highest tweet id already processed plus the
+    analyzed rows, stored as <directory>/<username>.json and <username>.pkl.
+    """
+    def __init__(self, directory=DEFAULT_CHECKPOINT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, username):
+        safe = re.sub(r'[^\w.-]', '_', username.lower())
+        base = os.path.join(self.directory, safe)
+        return base + ".json", base + ".pkl"
+
+    def load(self, username):
+        """
+        Returns (since_id, analyzed_df). since_id is None if the user was never scanned.
+        """
+        meta_path, rows_path = self._paths(username)
+        if not (os.path.exists(meta_path) and os.path.exists(rows_path)):
+            return None, pd.DataFrame()
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            rows = pd.read_pickle(rows_path)
+        except Exception as e:
+            print(f"Ignoring unreadable checkpoint for @{username}: {e}")
+            return None, pd.DataFrame()
+        return meta.get('since_id'), rows
+
+    def save(self, username, analyzed_df, since_id=None):
+        """
+        Stores the analyzed rows and the checkpoint id (default: highest id among the rows;
+        pass the highest fetched id so tweets dropped during cleaning aren't refetched).
+        Files are written to a temp name and renamed so a crash never leaves half a checkpoint.
+        """
+        if since_id is None:
+            if analyzed_df.empty or 'id' not in analyzed_df.columns:
+                return None
+            since_id = int(pd.to_numeric(analyzed_df['id']).max())
+        meta_path, rows_path = self._paths(username)
+
+        analyzed_df.to_pickle(rows_path + ".tmp")
+        os.replace(rows_path + ".tmp", rows_path)
+        with open(meta_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'since_id': since_id, 'rows': len(analyzed_df), 'updated_at': time.time()}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return since_id
+
+    def delete(self, username):
+        for path in self._paths(username):
+            if os.path.exists(path):
+                os.remove(path)
+
+def merge_history(new_rows, history, max_rows=None):
+    """
+    Puts new analyzed rows in front of the stored history (newest first),
+    dropping duplicate tweet ids and keeping at most max_rows.
+    """
+    if history.empty:
+        merged = new_rows
+    elif new_rows.empty:
+        merged = history
+    else:
+        merged = pd.concat([new_rows, history], ignore_index=True)
+    # Histories saved before ids/labels were typed hold them as strings
+    merged = compact_results(merged, keep_intermediate=True)
+    if 'id' in merged.columns:
+        merged = merged.drop_duplicates(subset='id', keep='first')
+    if max_rows is not None:
+        merged = merged.head(max_rows)
+    return merged.reset_index(drop=True)
@@ -1,14 +1,45 @@
 
+import hashlib
+import json
 import pandas as pd
 import os
 
-def load_data(filepath="data/Combined Data.csv"):
+DEFAULT_CACHE_DIR = "cache/datasets"
+
+def load_data(filepath="data/Combined Data.csv", use_cache=True, columns=None, cache_dir=DEFAULT_CACHE_DIR,
+              as_arrow=False):
     """
     Loads the dataset from the CSV file.
+    The validated, cleaned frame is cached as an uncompressed Feather (Arrow) file with
+    categorical labels; later calls read that columnar cache instead of re-parsing the CSV,
+    until the CSV's fingerprint changes. The default result is a regular pandas frame (the
+    columns are copied into pandas memory). columns: optional subset to load (e.g. ['label']).
+    as_arrow: return the cache as a memory-mapped pyarrow Table instead (zero-copy: pages
+    come straight from the OS page cache and are shared between processes reading it).
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
-    
+
+    # Taken before parsing, so a CSV edited meanwhile can't be cached under its new fingerprint
+    fingerprint = file_fingerprint(filepath)
+    if use_cache or as_arrow:
+        cached = _read_cache(filepath, cache_dir, columns, fingerprint, as_arrow)
+        if cached is not None:
+            return cached
+
+    df = _parse_csv(filepath)
+
+    if use_cache or as_arrow:
+        _write_cache(filepath, cache_dir, df, fingerprint)
+    if as_arrow:
+        cached = _read_cache(filepath, cache_dir, columns, fingerprint, as_arrow)
+        if cached is not None:
+            return cached
+        import pyarrow as pa
+        return pa.Table.from_pandas(df[columns] if columns is not None else df, preserve_index=False)
+    return df[columns] if columns is not None else df
+
+def _parse_csv(filepath):
     # Read CSV, handling potential irregularities
     df = pd.read_csv(filepath)
     
@@ -27,4 +58,94 @@ def load_data(filepath="data/Combined Data.csv"):
     # Drop rows with missing text or labels
     df = df.dropna(subset=['text', 'label'])
     
-    return df
+    # Same frame whether it comes from the CSV or the cache
+    df['text'] = df['text'].astype(str)
+    df['label'] = df['label'].astype('category')
+    return df.reset_index(drop=True)
+
+def file_fingerprint(filepath, sample_bytes=1 << 20):
+    """
+    Size, mtime and a hash of the first/last MB: cheap even for multi-GB CSVs,
+    and still catches in-place edits that keep the size.
+    """
+    stat = os.stat(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(sample_bytes))
+        if stat.st_size > sample_bytes:
+            f.seek(max(sample_bytes, stat.st_size - sample_bytes))
+            digest.update(f.read(sample_bytes))
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sample_sha256': digest.hexdigest()}
+
+def _cache_paths(filepath, cache_dir):
+    name = os.path.splitext(os.path.basename(filepath))[0].replace(' ', '_')
+    path_hash = hashlib.sha256(os.path.abspath(filepath).encode('utf-8')).hexdigest()[:8]
+    base = os.path.join(cache_dir, f"{name}-{path_hash}")
+    return base + ".feather", base + ".json"
+
+def _read_cache(filepath, cache_dir, columns, fingerprint, as_arrow=False):
+    try:
+        from pyarrow import feather
+    except ImportError:
+        if as_arrow:
+            raise
+        return None
+
+    data_path, meta_path = _cache_paths(filepath, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('fingerprint') != fingerprint:
+        print(f"Dataset cache is stale ({filepath} changed); re-parsing CSV.")
+        return None
+
+    try:
+        table = feather.read_table(data_path, columns=columns, memory_map=as_arrow)
+    except Exception as e:
+        print(f"Ignoring unreadable dataset cache {data_path}: {e}")
+        return None
+    if as_arrow:
+        return table
+    # Arrow buffers are released column by column as they are converted
+    return table.to_pandas(self_destruct=True)
+
+def _write_cache(filepath, cache_dir, df, fingerprint):
+    try:
+        from pyarrow import feather
+    except ImportError:
+        print("pyarrow not installed; dataset cache disabled.")
+        return
+
+    data_path, meta_path = _cache_paths(filepath, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    try:
+        # Uncompressed so the file can be memory-mapped as is (as_arrow) or read without
+        # a decompression pass
+        feather.write_feather(df, data_path + ".tmp", compression='uncompressed')
+        os.replace(data_path + ".tmp", data_path)
+        # Meta last: it vouches for the data file that is already in place
+        with open(meta_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'source': filepath, 'fingerprint': fingerprint, 'rows': len(df)}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except Exception as e:
+        print(f"Could not write dataset cache: {e}")
+
+def iter_data_chunks(filepath="data/Combined Data.csv", chunksize=50000, usecols=None):
+    """
+    Streams the dataset in chunks of chunksize rows, with the same renaming and
+    NaN dropping as load_data, so the whole CSV never has to fit in memory.
+    usecols: optional subset of the raw columns ('statement', 'status')
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    required = ['statement', 'status'] if usecols is None else list(usecols)
+    reader = pd.read_csv(filepath, chunksize=chunksize, usecols=usecols)
+    for i, chunk in enumerate(reader):
+        if i == 0 and not set(required) <= set(chunk.columns):
+            raise ValueError(f"CSV must contain {required} columns. Found: {chunk.columns.tolist()}")
+
+        chunk = chunk.rename(columns={'statement': 'text', 'status': 'label'})
+        chunk = chunk.dropna(subset=[c for c in ('text', 'label') if c in chunk.columns])
+        yield chunk
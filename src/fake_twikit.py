@@ -0,0 +1,97 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+SAMPLE_TEXTS = [
+    "I can't sleep again, my mind won't stop racing",
+    "Had a great day at the beach with friends!",
+    "I feel so empty, nothing matters anymore",
+    "Work deadlines are killing me, so stressed",
+    "Não aguento mais, tudo parece sem sentido",
+    "Hoje foi um dia incrível com a família",
+    "Just finished a 10k run, feeling amazing",
+    "Why does everything feel so heavy lately",
+]
+
+class FakeTweet:
+    """
+    Minimal stand-in for twikit.Tweet with the attributes the scraper reads.
+    """
+    def __init__(self, tweet_id, text, created_at):
+        self.id = str(tweet_id)
+        self.text = text
+        self.created_at = created_at
+
+class FakeResult(list):
+    """
+    Page of FakeTweets with twikit's Result.next() pagination.
+    """
+    def __init__(self, user, start, count):
+        super().__init__(user.tweets[start:start + count])
+        self._user = user
+        self._next_start = start + count
+        self._count = count
+
+    async def next(self):
+        await self._user.client.request()
+        return FakeResult(self._user, self._next_start, self._count)
+
+class FakeUser:
+    def __init__(self, client, screen_name, tweets):
+        self.client = client
+        self.screen_name = screen_name
+        self.tweets = tweets
+
+    async def get_tweets(self, tweet_type, count=20):
+        await self.client.request()
+        return FakeResult(self, 0, count)
+
+class FakeClient:
+    """
+    Offline stand-in for an authenticated twikit.Client.
+    Every profile has tweets_per_user synthetic tweets (newest first, descending ids);
+    each request sleeps for latency seconds and is counted in self.requests.
+    """
+    def __init__(self, tweets_per_user=200, latency=0.05, texts=None, seed=0):
+        self.tweets_per_user = tweets_per_user
+        self.latency = latency
+        self.texts = texts or SAMPLE_TEXTS
+        self.seed = seed
+        self.requests = 0
+        self._users = {}
+
+    async def request(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _make_tweets(self, screen_name):
+        rng = random.Random(f"{self.seed}:{screen_name}")
+        now = datetime(2025, 1, 1)
+        base_id = 1_800_000_000_000_000_000 + rng.randrange(10**9)
+        return [
+            FakeTweet(base_id - i, rng.choice(self.texts), now - timedelta(hours=i))
+            for i in range(self.tweets_per_user)
+        ]
+
+    def add_tweets(self, screen_name, texts):
+        """
+        Prepends new tweets to a profile (as if the user just posted them).
+        """
+        user = self.get_cached_user(screen_name)
+        newest = user.tweets[0] if user.tweets else None
+        next_id = int(newest.id) + 1 if newest else 1
+        new = [
+            FakeTweet(next_id + i, text, datetime(2025, 1, 1) + timedelta(minutes=i))
+            for i, text in enumerate(texts)
+        ]
+        user.tweets[:0] = reversed(new)
+
+    def get_cached_user(self, screen_name):
+        if screen_name not in self._users:
+            self._users[screen_name] = FakeUser(self, screen_name, self._make_tweets(screen_name))
+        return self._users[screen_name]
+
+    async def get_user_by_screen_name(self, screen_name):
+        await self.request()
+        return self.get_cached_user(screen_name)
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import numpy as np
+
+ARTIFACT_FORMAT = "tfidf-linear-v1"
+DEFAULT_ARTIFACT_DIR = "models/mental_health_model"
+
+# Files inside an artifact directory. Arrays are plain .npy so they can be memory-mapped.
+MANIFEST_FILE = "manifest.json"
+VOCAB_FILE = "vocab_terms.npy"      # sorted UTF-8 encoded terms, fixed-width bytes
+COLUMNS_FILE = "vocab_columns.npy"  # feature column of each sorted term
+IDF_FILE = "idf.npy"
+COEF_FILE = "coef.npy"              # (n_features, n_classes), row per feature for fast gathers
+INTERCEPT_FILE = "intercept.npy"
+ARRAY_FILES = (VOCAB_FILE, COLUMNS_FILE, IDF_FILE, COEF_FILE, INTERCEPT_FILE)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def export_artifact(pipeline, out_dir=DEFAULT_ARTIFACT_DIR, source=None):
+    """
+    Writes a TfidfVectorizer + linear classifier Pipeline as a compact artifact:
+    raw NumPy arrays (mmap-able) plus a small JSON manifest. Returns the manifest.
+    Files are written to a temp directory and moved in with os.replace, manifest last:
+    a predictor that has the old arrays memory-mapped keeps reading the old inodes.
+    """
+    vectorizer = pipeline.steps[0][1]
+    clf = pipeline.steps[-1][1]
+
+    params = vectorizer.get_params()
+    if (params['analyzer'] != 'word' or params['tokenizer'] or params['preprocessor']
+            or params['binary'] or params['strip_accents'] or not hasattr(vectorizer, 'vocabulary_')):
+        raise ValueError("Only word-level TfidfVectorizer pipelines can be exported")
+    coef, intercept = _linear_parts(clf)
+
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_dir = f"{out_dir.rstrip(os.sep)}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        manifest = _write_artifact(vectorizer, clf, coef, intercept, pipeline, params, tmp_dir, source)
+        # Arrays first, manifest last: until the new manifest is in, the arrays don't match
+        # the hashes it lists and the registry treats the artifact as still being written
+        for name in ARRAY_FILES + (MANIFEST_FILE,):
+            os.replace(os.path.join(tmp_dir, name), os.path.join(out_dir, name))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return manifest
+
+def _write_artifact(vectorizer, clf, coef, intercept, pipeline, params, out_dir, source):
+    """
+    Writes the artifact files into out_dir (a fresh directory). Returns the manifest.
+    """
+    # Bytes take a quarter of the space of numpy unicode; sorting encoded terms keeps searchsorted valid
+    terms = sorted(vectorizer.vocabulary_, key=lambda term: term.encode('utf-8'))
+    columns = np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.int32)
+    np.save(os.path.join(out_dir, VOCAB_FILE), np.array([t.encode('utf-8') for t in terms], dtype=np.bytes_))
+    np.save(os.path.join(out_dir, COLUMNS_FILE), columns)
+    n_features = len(terms)
+    idf = vectorizer.idf_ if params['use_idf'] else np.ones(n_features)
+    np.save(os.path.join(out_dir, IDF_FILE), np.asarray(idf, dtype=np.float64))
+    np.save(os.path.join(out_dir, COEF_FILE), np.ascontiguousarray(coef.T, dtype=np.float64))
+    np.save(os.path.join(out_dir, INTERCEPT_FILE), np.asarray(intercept, dtype=np.float64))
+
+    stop_words = vectorizer.get_stop_words()
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'classes': [str(c) for c in clf.classes_],
+        'n_features': n_features,
+        'lowercase': params['lowercase'],
+        'token_pattern': params['token_pattern'],
+        'ngram_range': list(params['ngram_range']),
+        'norm': params['norm'],
+        'sublinear_tf': params['sublinear_tf'],
+        'stop_words': sorted(stop_words) if stop_words else [],
+        'proba': _detect_proba_mode(pipeline, clf),
+        'source': source,
+        'files': {name: file_sha256(os.path.join(out_dir, name)) for name in ARRAY_FILES},
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+def _linear_parts(clf):
+    """
+    (coef, intercept) of a linear classifier with predict_proba. A OneVsRestClassifier
+    (how newer scikit-learn runs multiclass liblinear) has one binary model per class.
+    """
+    if not hasattr(clf, 'predict_proba'):
+        raise ValueError("Classifier must be linear with predict_proba")
+    if hasattr(clf, 'coef_'):
+        return clf.coef_, clf.intercept_
+    estimators = getattr(clf, 'estimators_', None)
+    if estimators and len(estimators) > 1 and all(hasattr(e, 'coef_') for e in estimators):
+        return (np.vstack([e.coef_ for e in estimators]),
+                np.concatenate([np.ravel(e.intercept_) for e in estimators]))
+    raise ValueError("Classifier must be linear with predict_proba")
+
+def _detect_proba_mode(pipeline, clf):
+    """
+    LogisticRegression uses one-vs-rest sigmoids or a softmax depending on solver and version;
+    check which one reproduces predict_proba on a few sample documents.
+    """
+    if len(clf.classes_) <= 2:
+        return 'binary'
+    sample = ["i feel so alone and tired", "great day with friends", "cant stop worrying about work"]
+    expected = pipeline.predict_proba(sample)
+    decision = pipeline.decision_function(sample)
+    if np.allclose(_softmax(decision), expected):
+        return 'softmax'
+    return 'ovr'
+
+def _softmax(decision):
+    shifted = decision - decision.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def _ovr(decision):
+    prob = 1.0 / (1.0 + np.exp(-decision))
+    return prob / prob.sum(axis=1, keepdims=True)
+
+class FastPredictor:
+    """
+    Numpy-only predictor for an exported artifact (no sklearn import).
+    The manifest is read eagerly; arrays are memory-mapped on first use, so
+    several processes share one copy of the model pages.
+    Exposes classes_, predict, predict_proba and decision_function like the Pipeline.
+    """
+    def __init__(self, artifact_dir=DEFAULT_ARTIFACT_DIR, mmap_mode='r'):
+        self.artifact_dir = artifact_dir
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(artifact_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported artifact format: {self.manifest.get('format')}")
+
+        self.classes_ = np.array(self.manifest['classes'], dtype=object)
+        self._token_pattern = re.compile(self.manifest['token_pattern'])
+        self._stop_words = frozenset(self.manifest['stop_words'])
+        self._min_n, self._max_n = self.manifest['ngram_range']
+        self._arrays = None
+
+    def _load(self):
+        if self._arrays is None:
+            load = lambda name: np.load(os.path.join(self.artifact_dir, name), mmap_mode=self.mmap_mode)
+            self._arrays = {
+                'terms': load(VOCAB_FILE),
+                'columns': load(COLUMNS_FILE),
+                'idf': load(IDF_FILE),
+                'coef': load(COEF_FILE),
+                'intercept': load(INTERCEPT_FILE),
+            }
+        return self._arrays
+
+    def _analyze(self, text):
+        """
+        Same tokens as TfidfVectorizer(analyzer='word'): lowercase, token_pattern,
+        stop words removed, then n-grams over the remaining tokens.
+        """
+        if self.manifest['lowercase']:
+            text = text.lower()
+        tokens = [t for t in self._token_pattern.findall(text) if t not in self._stop_words]
+        if self._max_n == 1:
+            return tokens
+        grams = list(tokens) if self._min_n == 1 else []
+        for n in range(max(self._min_n, 2), self._max_n + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, texts):
+        """
+        Returns the sparse TF-IDF rows as (doc_ids, columns, values) arrays.
+        """
+        arrays = self._load()
+        doc_ids = []
+        grams = []
+        for i, text in enumerate(texts):
+            doc_grams = self._analyze(str(text))
+            grams.extend(doc_grams)
+            doc_ids.extend([i] * len(doc_grams))
+        if not grams:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        # One vectorized lookup for every n-gram of the batch against the sorted vocabulary
+        # (auto width: casting to the vocabulary's width would truncate long n-grams into false hits)
+        grams = np.array([gram.encode('utf-8') for gram in grams], dtype=np.bytes_)
+        pos = np.searchsorted(arrays['terms'], grams)
+        pos[pos == len(arrays['terms'])] = 0
+        found = arrays['terms'][pos] == grams
+        cols = np.asarray(arrays['columns'])[pos[found]].astype(np.int64)
+        docs = np.asarray(doc_ids, dtype=np.int64)[found]
+
+        # Term counts per (doc, column)
+        n_features = self.manifest['n_features']
+        keys, counts = np.unique(docs * n_features + cols, return_counts=True)
+        docs, cols = keys // n_features, keys % n_features
+        values = counts.astype(np.float64)
+        if self.manifest['sublinear_tf']:
+            values = np.log(values) + 1
+        values *= arrays['idf'][cols]
+
+        if self.manifest['norm'] == 'l2':
+            norms = np.sqrt(np.bincount(docs, weights=values ** 2, minlength=len(texts)))
+            values /= norms[docs]
+        elif self.manifest['norm'] == 'l1':
+            norms = np.bincount(docs, weights=np.abs(values), minlength=len(texts))
+            values /= norms[docs]
+        return docs, cols, values
+
+    def decision_function(self, texts):
+        texts = list(texts)
+        arrays = self._load()
+        coef = arrays['coef']
+        decision = np.tile(np.asarray(arrays['intercept']), (len(texts), 1))
+        docs, cols, values = self.transform(texts)
+        if len(docs):
+            contrib = coef[cols] * values[:, None]
+            # Entries are grouped by doc (np.unique sorts the keys), so sum each segment
+            doc_starts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+            decision[docs[doc_starts]] += np.add.reduceat(contrib, doc_starts, axis=0)
+        return decision
+
+    def predict_proba(self, texts):
+        decision = self.decision_function(texts)
+        mode = self.manifest['proba']
+        if mode == 'binary':
+            pos = 1.0 / (1.0 + np.exp(-decision[:, 0]))
+            return np.column_stack([1 - pos, pos])
+        if mode == 'softmax':
+            return _softmax(decision)
+        return _ovr(decision)
+
+    def predict(self, texts):
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
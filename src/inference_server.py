@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.metrics import METRICS
+from src.model_registry import ModelRegistry
+from src.text_normalizer import clean_text
+
+class LatencyTracker:
+    """
+    Keeps the last `window` latencies (seconds) for percentile reporting.
+    """
+    def __init__(self, window=10000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self, *qs):
+        if not self.samples:
+            return {f"p{q}_ms": None for q in qs}
+        values = np.percentile(np.fromiter(self.samples, dtype=float), qs)
+        return {f"p{q}_ms": round(v * 1000, 3) for q, v in zip(qs, values)}
+
+class MicroBatcher:
+    """
+    Merges concurrent classify requests into one predict_proba call.
+    A batch is sent when it reaches max_batch texts or when the oldest request has
+    waited max_wait seconds, whichever comes first.
+    """
+    def __init__(self, registry, max_batch=64, max_wait=0.002):
+        self.registry = registry
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.request_latency = LatencyTracker()
+        self.model_latency = LatencyTracker()
+        self.batches = 0
+        self.batched_texts = 0
+        # One model thread: batches run back to back while the loop keeps accepting requests
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def classify(self, text):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((clean_text(text), future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    # Past the deadline: still take whatever is already queued
+                    while len(batch) < self.max_batch and not self.queue.empty():
+                        batch.append(self.queue.get_nowait())
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [item[0] for item in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self._predict, texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.batched_texts += len(batch)
+            now = time.perf_counter()
+            for (_, future, enqueued_at), result in zip(batch, results):
+                self.request_latency.add(now - enqueued_at)
+                if not future.done():
+                    future.set_result(result)
+
+    def _predict(self, texts):
+        model = self.registry.get()
+        if model is None:
+            raise RuntimeError("Model not loaded")
+        start = time.perf_counter()
+        probs = model.predict_proba(texts)
+        elapsed = time.perf_counter() - start
+        self.model_latency.add(elapsed)
+        METRICS.observe('stage_seconds', elapsed, stage='model')
+        METRICS.inc('tweets', len(texts), stage='model')
+        classes = [str(c) for c in model.classes_]
+        best = probs.argmax(axis=1)
+        return [
+            {
+                'prediction': classes[i],
+                'probability': float(row[i]),
+                'probabilities': dict(zip(classes, map(float, row))),
+            }
+            for i, row in zip(best, probs)
+        ]
+
+    def metrics(self):
+        info = self.registry.info() or {}
+        return {
+            'requests': self.request_latency.count,
+            'queue_depth': self.queue.qsize(),
+            'batches': self.batches,
+            'avg_batch_size': round(self.batched_texts / self.batches, 2) if self.batches else 0,
+            'request_latency': self.request_latency.percentiles(50, 99),
+            'model_latency': self.model_latency.percentiles(50, 99),
+            'model_version': info.get('version'),
+        }
+
+class InferenceServer:
+    """
+    Minimal asyncio HTTP/1.1 server (keep-alive, JSON except for Prometheus metrics):
+      POST /classify        {"text": "..."}
+      POST /classify_batch  {"texts": ["...", ...]}
+      GET  /metrics         latency percentiles, queue depth, batch stats
+      GET  /metrics/prometheus  process-wide stage metrics in Prometheus text format
+      GET  /health
+    Texts are cleaned but not translated; translate first if the input isn't English.
+    """
+    def __init__(self, batcher, max_body=1 << 20):
+        self.batcher = batcher
+        self.max_body = max_body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Bad request line'}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'error': 'Invalid Content-Length'}, keep_alive=False)
+                    break
+                if length > self.max_body:
+                    await self._respond(writer, 413, {'error': 'Body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                status, payload = await self._route(method, path.split('?')[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'model_loaded': self.batcher.registry.info() is not None}
+        if method == 'GET' and path == '/metrics':
+            return 200, self.batcher.metrics()
+        if method == 'GET' and path == '/metrics/prometheus':
+            return 200, METRICS.to_prometheus()
+        if method != 'POST' or path not in ('/classify', '/classify_batch'):
+            return 404, {'error': f'No route for {method} {path}'}
+
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError: # JSONDecodeError, or UnicodeDecodeError for non-UTF-8 bodies
+            return 400, {'error': 'Body must be JSON'}
+        if not isinstance(data, dict):
+            return 400, {'error': 'Body must be a JSON object'}
+
+        # Validated up front so only model/batcher failures below map to 503
+        if path == '/classify':
+            if not isinstance(data.get('text'), str):
+                return 400, {'error': "Expected {\"text\": \"...\"}"}
+        else:
+            texts = data.get('texts')
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                return 400, {'error': "Expected {\"texts\": [\"...\", ...]}"}
+
+        try:
+            if path == '/classify':
+                return 200, await self.batcher.classify(data['text'])
+            results = await asyncio.gather(*(self.batcher.classify(text) for text in texts))
+            return 200, {'results': results}
+        except Exception as e:
+            return 503, {'error': str(e)}
+
+    async def _respond(self, writer, status, payload, keep_alive=True):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                   503: 'Service Unavailable'}
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        head = (
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode('latin-1')
+        writer.write(head + body)
+        await writer.drain()
+
+async def serve(host='127.0.0.1', port=8000, max_batch=64, max_wait_ms=2.0, registry=None):
+    registry = registry or ModelRegistry()
+    if registry.get() is None:
+        raise RuntimeError("No model found; train or export one first.")
+    batcher = MicroBatcher(registry, max_batch, max_wait_ms / 1000)
+    batcher.start()
+    server = await asyncio.start_server(InferenceServer(batcher).handle, host, port)
+    print(f"Serving on http://{host}:{port} (max_batch={max_batch}, max_wait={max_wait_ms}ms)")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP inference server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64, help="Max texts per model call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Max time a request waits for a batch")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
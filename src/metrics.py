@@ -0,0 +1,244 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+class Metrics:
+    """
+    Process-wide counters and latency histograms, exportable as Prometheus text or JSON.
+    Metric names are plain strings; labels are keyword arguments (e.g. stage='translate').
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """
+        JSON-friendly view: counters, and count/sum/mean per histogram.
+        """
+        def label_str(labels):
+            return ",".join(f"{k}={v}" for k, v in labels)
+
+        with self._lock:
+            return {
+                'counters': {
+                    f"{name}{{{label_str(labels)}}}" if labels else name: value
+                    for (name, labels), value in sorted(self.counters.items())
+                },
+                'histograms': {
+                    f"{name}{{{label_str(labels)}}}" if labels else name: {
+                        'count': h.count,
+                        'sum_seconds': round(h.sum, 6),
+                        'mean_seconds': round(h.sum / h.count, 6) if h.count else None,
+                    }
+                    for (name, labels), h in sorted(self.histograms.items())
+                },
+            }
+
+    def write_json(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.time(), **self.snapshot()}, f, indent=1)
+
+    def to_prometheus(self):
+        """
+        Prometheus text exposition format (counters and cumulative histograms).
+        """
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{fmt_labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                for bound, count in zip(h.buckets, h.counts):
+                    lines.append(f"{name}_bucket{fmt_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{name}_sum{fmt_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{fmt_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics()
+
+# Per-scan stage breakdown. contextvars follow asyncio tasks and asyncio.to_thread,
+# so stages timed anywhere inside track_scan() land in the same dict.
+_current_scan = contextvars.ContextVar('current_scan', default=None)
+_current_profile = contextvars.ContextVar('current_profile', default=None)
+
+@contextmanager
+def stage(name):
+    """
+    Times one pipeline stage: recorded in METRICS ('stage_seconds', stage=name) and,
+    inside track_scan(), added to that scan's breakdown.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.observe('stage_seconds', elapsed, stage=name)
+        timings = _current_scan.get()
+        if timings is not None:
+            with timings['_lock']:
+                timings[name] = timings.get(name, 0.0) + elapsed
+
+@contextmanager
+def track_scan():
+    """
+    Collects a {stage: seconds} breakdown for everything timed inside the block,
+    plus 'total'. Yields the dict, which is filled in as stages finish.
+    """
+    timings = {'_lock': threading.Lock()}
+    token = _current_scan.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _current_scan.reset(token)
+        timings.pop('_lock', None)
+        timings['total'] = time.perf_counter() - start
+
+@contextmanager
+def profile_scan(path=None, top=25):
+    """
+    Optional cProfile hook for one scan. Yields a dict whose 'report' holds the top
+    functions by cumulative time once the block exits; stats are saved to path if given.
+    cProfile only sees the thread that enables it, so this covers the calling thread
+    (event loop, scraping) plus work started through run_profiled (page analysis);
+    'threads' is how many profiles were merged into the report.
+    """
+    result = {}
+    profilers = []
+    token = _current_profile.set(profilers)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        _current_profile.reset(token)
+        stats = pstats.Stats(profiler)
+        for worker in list(profilers):
+            stats.add(worker)
+        result['threads'] = 1 + len(profilers)
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            stats.dump_stats(path)
+            result['path'] = path
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats('cumulative').print_stats(top)
+        result['report'] = out.getvalue()
+
+def run_profiled(func, *args, **kwargs):
+    """
+    Calls func; inside a profile_scan (e.g. from asyncio.to_thread, which carries the
+    context over) it runs under its own cProfile whose stats join the scan's report.
+    """
+    profilers = _current_profile.get()
+    if profilers is None:
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError: # Another profiler already covers this thread
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        profilers.append(profiler)
+
+def start_http_exporter(port=9100, host='127.0.0.1'):
+    """
+    Serves METRICS at http://host:port/metrics (Prometheus text) and /metrics.json
+    from a daemon thread. Returns the server.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = METRICS.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = json.dumps(METRICS.snapshot()).encode('utf-8'), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
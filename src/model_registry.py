@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import joblib
+from src.fast_model import DEFAULT_ARTIFACT_DIR, MANIFEST_FILE, FastPredictor, file_sha256
+
+DEFAULT_MODEL_PATH = "models/mental_health_model.pkl"
+
+def _artifact_files(path):
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    return [path]
+
+def stat_signature(path):
+    """
+    Cheap change check: (name, mtime_ns, size) of every file in the artifact.
+    """
+    return tuple(
+        (os.path.basename(f), os.stat(f).st_mtime_ns, os.stat(f).st_size)
+        for f in _artifact_files(path)
+    )
+
+def artifact_complete(path):
+    """
+    export_artifact moves manifest.json in last, and the manifest lists the SHA-256 of
+    every array: the directory holds one consistent export only when they all match.
+    (File mtimes can't tell, since a checkout or copy doesn't keep them in order.)
+    Artifacts exported before the manifest listed its files are taken as complete.
+    """
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            files = json.load(f).get('files')
+        return files is None or all(
+            file_sha256(os.path.join(path, name)) == digest for name, digest in files.items()
+        )
+    except (OSError, ValueError):
+        return False
+
+def content_hash(path):
+    """
+    SHA-256 over the artifact's files (names and contents).
+    """
+    digest = hashlib.sha256()
+    for f in _artifact_files(path):
+        digest.update(os.path.basename(f).encode('utf-8'))
+        with open(f, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """
+    Holds the active model and reloads it only when the artifact on disk really changes.
+    get() is cheap: at most every check_interval seconds it stats the files, and only
+    hashes them when mtime/size differ. A directory is only loaded when the whole export is
+    in place (see artifact_complete) and unchanged across the load. The new model is loaded
+    on the side and swapped in with a single assignment; callers holding the old model keep
+    using it, since export_artifact replaces files instead of rewriting the mapped ones.
+    Prefers the fast artifact directory and falls back to the joblib pickle.
+    """
+    def __init__(self, artifact_dir=DEFAULT_ARTIFACT_DIR, model_path=DEFAULT_MODEL_PATH, check_interval=2.0):
+        self.artifact_dir = artifact_dir
+        self.model_path = model_path
+        self.check_interval = check_interval
+        self._active = None # (model, info)
+        self._signature = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+
+    def _source(self):
+        if os.path.exists(os.path.join(self.artifact_dir, MANIFEST_FILE)):
+            return self.artifact_dir, 'artifact'
+        if os.path.exists(self.model_path):
+            return self.model_path, 'pickle'
+        return None, None
+
+    def _load(self, path, kind):
+        if kind == 'artifact':
+            model = FastPredictor(path)
+            model.predict_proba([""]) # Touch the arrays so the first request doesn't pay for it
+            return model
+        return joblib.load(path)
+
+    def refresh(self, force=False):
+        """
+        Reloads the model if the artifact changed. Returns True if a new model was swapped in.
+        """
+        # Only one thread checks/reloads; the others keep serving the current model
+        if not self._reload_lock.acquire(blocking=self._active is None):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            path, kind = self._source()
+            if path is None:
+                if self._active is None:
+                    print("Model file not found.")
+                return False
+
+            try:
+                signature = stat_signature(path)
+            except OSError:
+                return False # Artifact being replaced right now; try again on the next check
+            if not force and signature == self._signature:
+                return False
+            if kind == 'artifact' and not artifact_complete(path):
+                return False # Export halfway through moving files in; try again on the next check
+
+            version = content_hash(path)
+            active_info = self._active[1] if self._active else None
+            if not force and active_info and active_info['hash'] == version and active_info['path'] == path:
+                self._signature = signature # Touched but not changed (e.g. copied over with same bytes)
+                return False
+
+            print(f"Loading model from {path}...")
+            start = time.perf_counter()
+            model = self._load(path, kind)
+            load_seconds = time.perf_counter() - start
+
+            # Directory changed while loading (another export landed): keep the old model for now
+            if stat_signature(path) != signature:
+                print("Model artifact changed during load; will retry.")
+                return False
+
+            info = {
+                'version': version[:12],
+                'hash': version,
+                'path': path,
+                'kind': kind,
+                'loaded_at': time.time(),
+                'load_seconds': load_seconds,
+            }
+            self._active = (model, info)
+            self._signature = signature
+            print(f"Model {info['version']} ({kind}) loaded in {load_seconds:.3f}s")
+            return True
+        except Exception as e:
+            print(f"Model reload failed, keeping the current model: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+
+    def get(self):
+        """
+        Returns the active model (None if there is none), checking for updates first.
+        """
+        if self._active is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        active = self._active
+        return active[0] if active else None
+
+    def info(self):
+        """
+        Version (content hash prefix), full hash, path, kind, loaded_at and load_seconds of the active model.
+        """
+        active = self._active
+        return dict(active[1]) if active else None
@@ -0,0 +1,211 @@
+import argparse
+import itertools
+import json
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.pipeline import Pipeline
+from src.data_loader import load_data
+from src.text_normalizer import clean_series
+
+# Grid around the settings used by model_train.train_model
+DEFAULT_GRID = {
+    'vectorizer': {
+        'max_features': [5000, 10000, 20000],
+        'ngram_range': [[1, 1], [1, 2]],
+        'min_df': [5],
+    },
+    'classifier': {
+        'C': [0.5, 1.0, 2.0],
+        'solver': ['liblinear'],
+    },
+}
+
+def expand_grid(grid):
+    """
+    {'a': [1, 2], 'b': [3]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]
+    """
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def _vectorizer_params(params):
+    params = dict(params)
+    if 'ngram_range' in params:
+        params['ngram_range'] = tuple(params['ngram_range'])
+    return params
+
+def _fit_vectorizer(vec_params, train_texts, test_texts):
+    vectorizer = TfidfVectorizer(stop_words='english', **_vectorizer_params(vec_params))
+    X_train = vectorizer.fit_transform(train_texts)
+    X_test = vectorizer.transform(test_texts)
+    return vectorizer, X_train, X_test
+
+def make_classifier(clf_params):
+    """
+    LogisticRegression as in model_train. Newer scikit-learn versions dropped multiclass
+    support from liblinear, so liblinear runs wrapped in an explicit one-vs-rest.
+    """
+    clf = LogisticRegression(class_weight='balanced', max_iter=1000, **clf_params)
+    if clf_params.get('solver') == 'liblinear':
+        return OneVsRestClassifier(clf)
+    return clf
+
+def _evaluate(clf_params, X_train, y_train, X_test, y_test, keep_model=False):
+    start = time.perf_counter()
+    clf = make_classifier(clf_params)
+    clf.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = clf.predict(X_test)
+    result = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'f1_macro': f1_score(y_test, y_pred, average='macro'),
+        'fit_seconds': fit_seconds,
+    }
+    if keep_model:
+        result['clf'] = clf
+    return result
+
+def _measure_serving(vectorizer, clf, texts, repeat=3):
+    """
+    End-to-end serving cost: raw cleaned text -> TF-IDF -> predict_proba.
+    Returns (tweets_per_sec, model_bytes).
+    """
+    pipeline = Pipeline([('tfidf', vectorizer), ('clf', clf)])
+    best = float('inf')
+    for _ in range(repeat): # Best of repeat to damp timer noise
+        start = time.perf_counter()
+        pipeline.predict_proba(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best, len(pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL))
+
+def run_sweep(texts, labels, grid=None, folds=3, n_jobs=-1, throughput_sample=2000, random_state=42):
+    """
+    Cross-validated grid search over vectorizer x classifier settings.
+    The TF-IDF matrices are fitted once per (vectorizer config, fold) and reused for every
+    classifier config; both stages run in parallel with joblib. Throughput is then measured
+    serially on one held-out sample shared by all configs.
+    Returns a DataFrame with one row per config (mean over folds).
+    """
+    grid = grid or DEFAULT_GRID
+    texts = np.asarray(texts, dtype=object)
+    labels = np.asarray(labels)
+    splits = list(StratifiedKFold(folds, shuffle=True, random_state=random_state).split(texts, labels))
+    vec_configs = expand_grid(grid['vectorizer'])
+    clf_configs = expand_grid(grid['classifier'])
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        # Stage 1: TF-IDF matrices, cached for all classifier settings
+        print(f"Fitting {len(vec_configs)} vectorizer configs x {folds} folds...")
+        fitted = parallel(
+            delayed(_fit_vectorizer)(vec_params, texts[train_idx], texts[test_idx])
+            for vec_params in vec_configs
+            for train_idx, test_idx in splits
+        )
+        matrices = {
+            (v, f): fitted[v * folds + f] for v in range(len(vec_configs)) for f in range(folds)
+        }
+
+        # Stage 2: every classifier config on every cached matrix
+        print(f"Fitting {len(vec_configs) * len(clf_configs)} configs x {folds} folds...")
+        jobs = [
+            (v, c, f)
+            for v in range(len(vec_configs))
+            for c in range(len(clf_configs))
+            for f in range(folds)
+        ]
+        scores = parallel(
+            delayed(_evaluate)(
+                clf_configs[c], matrices[v, f][1], labels[splits[f][0]],
+                matrices[v, f][2], labels[splits[f][1]],
+                keep_model=(f == 0) # Fold 0 models are kept for the throughput pass
+            )
+            for v, c, f in jobs
+        )
+
+    # Stage 3: throughput, serially and on the same sample for every config, so the
+    # numbers aren't skewed by whatever the other workers were fitting at the time
+    print(f"Measuring throughput of {len(vec_configs) * len(clf_configs)} configs...")
+    throughput_texts = texts[splits[0][1][:throughput_sample]]
+    serving = {}
+    for i, (v, c, f) in enumerate(jobs):
+        if f == 0:
+            serving[v, c] = _measure_serving(matrices[v, f][0], scores[i].pop('clf'), throughput_texts)
+
+    rows = []
+    for v, vec_params in enumerate(vec_configs):
+        for c, clf_params in enumerate(clf_configs):
+            fold_scores = [scores[i] for i, (jv, jc, _) in enumerate(jobs) if jv == v and jc == c]
+            row = {f"vec_{k}": str(val) if isinstance(val, list) else val for k, val in vec_params.items()}
+            row.update({f"clf_{k}": val for k, val in clf_params.items()})
+            row['accuracy'] = np.mean([s['accuracy'] for s in fold_scores])
+            row['accuracy_std'] = np.std([s['accuracy'] for s in fold_scores])
+            row['f1_macro'] = np.mean([s['f1_macro'] for s in fold_scores])
+            row['fit_seconds'] = np.mean([s['fit_seconds'] for s in fold_scores])
+            row['tweets_per_sec'], row['model_bytes'] = serving[v, c]
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+def rank_report(report, rank_by='f1_macro'):
+    """
+    Sorts configs by rank_by (ascending for model_bytes, descending otherwise) and flags the Pareto front on (f1_macro, tweets_per_sec):
+    configs no other config beats on both accuracy and speed.
+    """
+    report = report.copy()
+    f1 = report['f1_macro'].to_numpy()
+    speed = report['tweets_per_sec'].to_numpy()
+    dominated = [
+        bool(((f1 >= f1[i]) & (speed >= speed[i]) & ((f1 > f1[i]) | (speed > speed[i]))).any())
+        for i in range(len(report))
+    ]
+    report['pareto'] = ~np.array(dominated, dtype=bool)
+    report = report.sort_values(rank_by, ascending=rank_by == 'model_bytes').reset_index(drop=True)
+    report.insert(0, 'rank', np.arange(1, len(report) + 1))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep for the TF-IDF + LR model.")
+    parser.add_argument("--data", default="data/Combined Data.csv")
+    parser.add_argument("--grid", help="JSON file with 'vectorizer' and 'classifier' param lists")
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel workers (-1: all cores)")
+    parser.add_argument("--sample", type=int, help="Use a random subset of rows for faster sweeps")
+    parser.add_argument("--rank-by", default="f1_macro",
+                        choices=["f1_macro", "accuracy", "tweets_per_sec", "model_bytes"])
+    parser.add_argument("--output", default="reports/sweep", help="Report path prefix (.csv and .json)")
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    df = load_data(args.data)
+    if args.sample and args.sample < len(df):
+        df = df.sample(args.sample, random_state=42)
+    df['clean_text'] = clean_series(df['text'])
+    df = df[df['clean_text'].str.strip().astype(bool)]
+    print(f"Sweeping on {len(df)} rows...")
+
+    start = time.time()
+    report = rank_report(run_sweep(df['clean_text'], df['label'], grid, args.folds, args.jobs), args.rank_by)
+    print(f"Sweep finished in {time.time() - start:.1f}s")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    report.to_csv(args.output + ".csv", index=False)
+    report.to_json(args.output + ".json", orient="records", indent=1)
+    print(report.to_string(index=False))
+    print(f"Report written to {args.output}.csv / .json")
+
+if __name__ == "__main__":
+    main()
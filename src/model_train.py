@@ -1,22 +1,41 @@
 
+import os
+import shutil
+import numpy as np
 import pandas as pd
 import joblib
-import re
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report, accuracy_score
-from src.data_loader import load_data
+from sklearn.multiclass import OneVsRestClassifier
+from src.data_loader import iter_data_chunks, load_data
+from src.fast_model import DEFAULT_ARTIFACT_DIR, export_artifact
+from src.text_normalizer import clean_series
 
 MODEL_PATH = "models/mental_health_model.pkl"
+ARTIFACT_DIR = DEFAULT_ARTIFACT_DIR
 
-def clean_text(text):
-    text = str(text).lower()
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE) # Remove URLs
-    text = re.sub(r'@\w+', '', text) # Remove Mentions
-    text = re.sub(r'[^a-zA-Z\s]', '', text) # Remove strict special chars (keep only letters)
-    return text
+def build_pipeline():
+    """
+    The TF-IDF + LogisticRegression pipeline train_model fits (also timed by src.benchmark).
+    Newer scikit-learn dropped multiclass liblinear, so it runs in an explicit one-vs-rest,
+    the scheme liblinear always used.
+    """
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(
+            stop_words='english', 
+            max_features=10000, # Increased features
+            ngram_range=(1, 2), # Use bigrams to capture "not happy", "wanna die"
+            min_df=5 # Ignore incredibly rare words (like "opera" if it only appears once)
+        )), 
+        ('clf', OneVsRestClassifier(LogisticRegression(
+            solver='liblinear', 
+            class_weight='balanced', # Fix imbalance
+            max_iter=1000
+        )))
+    ])
 
 def train_model():
     print("Loading data...")
@@ -30,7 +49,7 @@ def train_model():
     
     # 1. Clean Data
     print("Cleaning texts...")
-    df['clean_text'] = df['text'].apply(clean_text)
+    df['clean_text'] = clean_series(df['text'])
     
     # Drop empty after cleaning
     df = df[df['clean_text'].str.strip().astype(bool)]
@@ -45,21 +64,7 @@ def train_model():
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    # Create Pipeline: Vectorizer + Classifier
-    pipeline = Pipeline([
-        ('tfidf', TfidfVectorizer(
-            stop_words='english', 
-            max_features=10000, # Increased features
-            ngram_range=(1, 2), # Use bigrams to capture "not happy", "wanna die"
-            min_df=5 # Ignore incredibly rare words (like "opera" if it only appears once)
-        )), 
-        ('clf', LogisticRegression(
-            solver='liblinear', 
-            multi_class='auto',
-            class_weight='balanced', # Fix imbalance
-            max_iter=1000
-        ))
-    ])
+    pipeline = build_pipeline()
 
     print("Training model (this might take a bit longer)...")
     pipeline.fit(X_train, y_train)
@@ -72,7 +77,130 @@ def train_model():
     # Save model
     print(f"Saving model to {MODEL_PATH}...")
     joblib.dump(pipeline, MODEL_PATH)
+    export_model(pipeline)
     print("Done.")
 
+def _holdout_mask(start, n_rows, test_every=5):
+    # Deterministic split that works chunk by chunk: every test_every-th row is held out
+    return (np.arange(start, start + n_rows) % test_every) == 0
+
+def train_model_streaming(filepath="data/Combined Data.csv", chunksize=50000, n_features=2 ** 20,
+                          epochs=1, alpha=1e-5):
+    """
+    Out-of-core training for corpora larger than memory.
+    Pass 1 streams the CSV once to collect labels and hashed document frequencies (for IDF);
+    then SGDClassifier is trained with partial_fit chunk by chunk. Only one chunk is in memory
+    at a time. The result is a Pipeline with the usual predict/predict_proba/classes_.
+    """
+    hasher = HashingVectorizer(
+        stop_words='english',
+        ngram_range=(1, 2), # Use bigrams to capture "not happy", "wanna die"
+        n_features=n_features,
+        alternate_sign=False, # Keep counts non-negative so TF-IDF stays meaningful
+        norm=None
+    )
+
+    def chunks():
+        row = 0
+        for chunk in iter_data_chunks(filepath, chunksize):
+            cleaned = clean_series(chunk['text'])
+            keep = cleaned.str.strip().astype(bool).to_numpy()
+            test = _holdout_mask(row, len(chunk))
+            row += len(chunk)
+            yield cleaned.to_numpy()[keep], chunk['label'].astype(str).to_numpy()[keep], test[keep]
+
+    # Pass 1: labels and document frequencies of the hashed features
+    print("Pass 1: counting labels and document frequencies...")
+    label_counts = {}
+    doc_freq = np.zeros(n_features, dtype=np.int64)
+    n_docs = 0
+    for texts, labels, test in chunks():
+        train_texts = texts[~test]
+        for label, count in zip(*np.unique(labels[~test], return_counts=True)):
+            label_counts[label] = label_counts.get(label, 0) + int(count)
+        counts = hasher.transform(train_texts)
+        doc_freq += np.bincount(counts.indices, minlength=n_features)
+        n_docs += len(train_texts)
+    if not n_docs:
+        print("No training rows found.")
+        return None
+
+    print(f"Training rows: {n_docs}")
+    print("Labels distribution:")
+    print(pd.Series(label_counts).sort_values(ascending=False))
+
+    # Same smoothed IDF formula as TfidfVectorizer
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+    classes = np.array(sorted(label_counts))
+    # partial_fit can't use class_weight='balanced', so compute the same weights up front
+    class_weight = {label: n_docs / (len(classes) * count) for label, count in label_counts.items()}
+    clf = SGDClassifier(loss='log_loss', alpha=alpha, class_weight=class_weight, random_state=42)
+
+    # Pass 2..: incremental fit
+    rng = np.random.default_rng(42)
+    for epoch in range(epochs):
+        print(f"Epoch {epoch + 1}/{epochs}: training on chunks...")
+        for texts, labels, test in chunks():
+            order = rng.permutation(int((~test).sum()))
+            X = tfidf.transform(hasher.transform(texts[~test]))[order]
+            clf.partial_fit(X, labels[~test][order], classes=classes)
+
+    pipeline = Pipeline([('hash', hasher), ('tfidf', tfidf), ('clf', clf)])
+
+    print("Evaluating model on held-out rows...")
+    y_test, y_pred = [], []
+    for texts, labels, test in chunks():
+        if test.any():
+            y_test.append(labels[test])
+            y_pred.append(pipeline.predict(texts[test]))
+    if y_test:
+        y_test, y_pred = np.concatenate(y_test), np.concatenate(y_pred)
+        print(f"Accuracy: {accuracy_score(y_test, y_pred)}")
+        print(classification_report(y_test, y_pred))
+
+    # Save model
+    print(f"Saving model to {MODEL_PATH}...")
+    joblib.dump(pipeline, MODEL_PATH)
+    export_model(pipeline)
+    print("Done.")
+    return pipeline
+
+def export_model(pipeline=None, out_dir=ARTIFACT_DIR):
+    """
+    Writes the fast-loading artifact (see src/fast_model.py) next to the pickle.
+    Without a pipeline, converts the pickle at MODEL_PATH.
+    """
+    if pipeline is None:
+        print(f"Loading model from {MODEL_PATH}...")
+        pipeline = joblib.load(MODEL_PATH)
+    print(f"Exporting fast artifact to {out_dir}...")
+    try:
+        export_artifact(pipeline, out_dir, source=MODEL_PATH)
+    except ValueError as e:
+        print(f"Skipping artifact export: {e}")
+        # A stale artifact would shadow the new pickle in the model registry
+        if os.path.isdir(out_dir):
+            print(f"Removing stale artifact {out_dir}")
+            shutil.rmtree(out_dir)
+
 if __name__ == "__main__":
-    train_model()
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the mental health classifier.")
+    parser.add_argument("--export-only", action="store_true",
+                        help=f"Don't train; convert {MODEL_PATH} to the fast artifact format")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Out-of-core training (hashed features + SGD, chunked CSV reads)")
+    parser.add_argument("--data", default="data/Combined Data.csv")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Rows per chunk (--streaming)")
+    parser.add_argument("--n-features", type=int, default=2 ** 20, help="Hashed feature space (--streaming)")
+    parser.add_argument("--epochs", type=int, default=1, help="Passes over the data (--streaming)")
+    args = parser.parse_args()
+
+    if args.export_only:
+        export_model()
+    elif args.streaming:
+        train_model_streaming(args.data, args.chunksize, args.n_features, args.epochs)
+    else:
+        train_model()
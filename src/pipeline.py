@@ -0,0 +1,116 @@
+import asyncio
+import pandas as pd
+from src.checkpoints import CheckpointStore, merge_history
+from src.metrics import run_profiled
+from src.scraper import iter_tweet_pages, scrape_profile_with_login
+from src.utils import analyze_profile
+
+async def analyze_pages(pages, model, class_probabilities=False):
+    """
+    Async generator over (page_df, analyzed_df) pairs.
+    While a page is cleaned, translated and classified in a worker thread,
+    the next page is already being fetched.
+    """
+    pages = pages.__aiter__()
+    next_page = asyncio.ensure_future(pages.__anext__())
+    try:
+        while True:
+            try:
+                page = await next_page
+            except StopAsyncIteration:
+                return
+            # Prefetch the following page before starting on this one
+            next_page = asyncio.ensure_future(pages.__anext__())
+            analyzed = await asyncio.to_thread(
+                run_profiled, analyze_profile, page, model, class_probabilities=class_probabilities
+            )
+            yield page, analyzed
+    finally:
+        if not next_page.done():
+            next_page.cancel()
+
+async def stop_if_cached(pages, is_cached):
+    """
+    Passes pages through, unless is_cached(latest_tweet_id) is true for the first (newest)
+    page: then nothing is yielded and pagination stops after that one request.
+    """
+    try:
+        first = True
+        async for page in pages:
+            if first:
+                first = False
+                if not page.empty and is_cached(int(pd.to_numeric(page['id']).max())):
+                    return
+            yield page
+    finally:
+        await pages.aclose()
+
+def iterate_sync(agen):
+    """
+    Drives an async generator from synchronous code (e.g. a Streamlit script),
+    returning items one at a time as they become available.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+def stream_profile_analysis(target_username, model, auth_info=None, cookies_path=None, target_count=200,
+                            class_probabilities=False, is_cached=None):
+    """
+    Sync helper for Streamlit: yields (page_df, analyzed_df) per page of tweets.
+    is_cached(latest_tweet_id): checked on the first page; if it returns True the scan
+    stops there and yields nothing, so cached results cost one request and no analysis.
+    """
+    pages = iter_tweet_pages(target_username, auth_info, cookies_path, target_count)
+    if is_cached is not None:
+        pages = stop_if_cached(pages, is_cached)
+    return iterate_sync(analyze_pages(pages, model, class_probabilities))
+
+async def scan_profile_incremental(target_username, model, store=None, auth_info=None, cookies_path=None,
+                                   target_count=200, client=None, rate_limiter=None, max_history=None,
+                                   class_probabilities=False):
+    """
+    Re-scans a profile, fetching and analyzing only tweets newer than its checkpoint
+    (all of them: target_count only caps the first scan), then merges them with the stored history.
+    Returns (merged_df, new_tweet_count), or (None, 0) if the scrape or the analysis failed;
+    the checkpoint only moves past tweets that were analyzed (or dropped as empty by cleaning).
+    """
+    if store is None:
+        store = CheckpointStore()
+    since_id, history = store.load(target_username)
+
+    status = {}
+    new_tweets = await scrape_profile_with_login(
+        target_username, auth_info, cookies_path, target_count, client, rate_limiter, since_id, status
+    )
+    if new_tweets is None:
+        return None, 0
+    if new_tweets.empty:
+        print(f"@{target_username}: no new tweets since {since_id}")
+        return history, 0
+
+    try:
+        new_rows = await asyncio.to_thread(
+            run_profiled, analyze_profile, new_tweets, model, class_probabilities=class_probabilities
+        )
+    except Exception as e:
+        # Keep the checkpoint where it was so these tweets are fetched again next time
+        print(f"@{target_username}: analysis failed, checkpoint not advanced: {e}")
+        return None, 0
+    merged = merge_history(new_rows, history, max_history)
+    newest_id = int(pd.to_numeric(new_tweets['id']).max())
+    if since_id is not None and not status.get('complete'):
+        # The scan stopped before reaching the old checkpoint: moving it to newest_id would
+        # skip the tweets in between, so keep it and let the next scan fill the gap
+        print(f"@{target_username}: checkpoint {since_id} not reached; keeping it")
+        newest_id = since_id
+    store.save(target_username, merged, max(newest_id, since_id or 0))
+    print(f"@{target_username}: {len(new_tweets)} new tweets, {len(merged)} in history")
+    return merged, len(new_tweets)
@@ -0,0 +1,61 @@
+import pandas as pd
+
+# Typed columnar layout shared by the scraper, the analysis and stored histories:
+#   text: str, date: datetime64 (naive UTC), id: int64, prediction/language: categorical
+TWEET_COLUMNS = ['text', 'date', 'id']
+# Columns prepare_profile needs on the way to a prediction; dropped from results unless asked for
+INTERMEDIATE_COLUMNS = ['language', 'cleaned_text', 'translated_text']
+CATEGORICAL_COLUMNS = ['prediction', 'language']
+
+def parse_dates(values):
+    """
+    Tweet dates (datetimes or twikit strings like 'Wed Oct 10 20:19:24 +0000 2018') as naive UTC.
+    Unparseable values become NaT.
+    """
+    dates = pd.to_datetime(pd.Series(values), errors='coerce', utc=True, format='mixed')
+    return dates.dt.tz_convert(None)
+
+def parse_ids(values):
+    """
+    Tweet ids as int64 (nullable Int64 if some are missing). Parsed from the strings
+    directly, since going through float would corrupt 19-digit ids.
+    """
+    ids = pd.Series(values)
+    try:
+        return ids.astype('int64')
+    except (TypeError, ValueError):
+        return pd.Series(
+            [int(v) if pd.notna(v) and str(v).strip().isdigit() else None for v in ids],
+            index=ids.index, dtype='Int64'
+        )
+
+def tweet_frame(texts, dates, ids):
+    """
+    Typed 'text', 'date', 'id' frame from three aligned sequences.
+    """
+    return pd.DataFrame({
+        'text': pd.Series(list(texts), dtype=object),
+        'date': parse_dates(list(dates)),
+        'id': parse_ids(list(ids)),
+    }, columns=TWEET_COLUMNS)
+
+def compact_results(df, keep_intermediate=False):
+    """
+    Final form of an analyzed frame: drops the intermediate text columns (unless
+    keep_intermediate), stores labels as categoricals, dates as datetime64 and ids as int64.
+    Returns the compacted frame.
+    """
+    if df is None or df.empty:
+        return df
+    if not keep_intermediate:
+        df = df.drop(columns=[c for c in INTERMEDIATE_COLUMNS if c in df.columns])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+        dates = parse_dates(df['date'].to_numpy())
+        if dates.notna().any(): # '' when the input had no dates: leave as is
+            df['date'] = dates.to_numpy()
+    if 'id' in df.columns and not pd.api.types.is_integer_dtype(df['id']):
+        df['id'] = parse_ids(df['id'].to_numpy()).to_numpy()
+    return df
@@ -0,0 +1,56 @@
+import hashlib
+import threading
+from src.translation_cache import LRUCache
+
+def profile_key(username, latest_tweet_id, model_version):
+    """
+    A profile's results are valid until it posts a new tweet or the model changes.
+    """
+    return f"profile:{username.lower()}:{latest_tweet_id}:{model_version}"
+
+def text_key(text, model_version):
+    """
+    Hash of the normalized text (whitespace and case collapsed, as in the translation cache)
+    plus the model version.
+    """
+    normalized = " ".join(str(text).split()).lower()
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return f"text:{digest}:{model_version}"
+
+class ResultCache:
+    """
+    Bounded, thread-safe LRU for finished analysis results (DataFrames, prediction dicts).
+    Meant to be shared by every session of a server process; entries expire after ttl_seconds.
+    """
+    def __init__(self, max_entries=64, ttl_seconds=6 * 3600):
+        self.entries = LRUCache(max_entries, ttl_seconds)
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key)
+            self.stats['hits' if value is not None else 'misses'] += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self.entries.set(key, value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value, or computes, stores and returns it. None results aren't cached.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from src.records import parse_dates
+from src.utils import PROBABILITY_PREFIX
+
+# Severity of each class for the risk score: expected severity = sum of P(class) * weight
+RISK_WEIGHTS = {
+    'Suicidal': 1.0,
+    'Depression': 0.7,
+    'Bipolar': 0.6,
+    'Personality disorder': 0.5,
+    'Anxiety': 0.5,
+    'Stress': 0.3,
+    'Normal': 0.0,
+}
+# Profile diagnosis rules (same as the dashboard always used): any tweet classified as
+# ALERT_CLASS raises an alert; otherwise the first class whose share passes its threshold
+# wins, and the most frequent class is the fallback
+ALERT_CLASS = 'Suicidal'
+DOMINANT_THRESHOLDS = [('Depression', 0.15), ('Anxiety', 0.15)]
+
+def _class_matrix(df):
+    """
+    (classes, probabilities) from the 'prob_<class>' columns. Rows without them (or frames
+    analyzed without class_probabilities) fall back to a one-hot of 'prediction' scaled
+    by 'probability', since only the top class is known there.
+    """
+    prob_columns = [c for c in df.columns if c.startswith(PROBABILITY_PREFIX)]
+    classes = [c[len(PROBABILITY_PREFIX):] for c in prob_columns]
+    if 'prediction' in df.columns:
+        classes += sorted(set(df['prediction'].dropna().astype(str)) - set(classes))
+    probs = np.zeros((len(df), len(classes)))
+    if prob_columns:
+        probs[:, :len(prob_columns)] = df[prob_columns].to_numpy(dtype=float)
+
+    missing = np.isnan(probs).any(axis=1) if prob_columns else np.ones(len(df), dtype=bool)
+    if missing.any() and 'prediction' in df.columns:
+        index = {cls: i for i, cls in enumerate(classes)}
+        rows = np.flatnonzero(missing)
+        codes = df['prediction'].to_numpy()[rows]
+        known = pd.notna(codes)
+        probs[rows] = 0.0
+        probs[rows[known], [index[str(c)] for c in codes[known]]] = df['probability'].to_numpy(dtype=float)[rows[known]]
+    return classes, np.nan_to_num(probs)
+
+def _group_keys(df, by):
+    if by is None:
+        return [pd.Series('', index=df.index, name='profile')]
+    return [df[column] for column in ([by] if isinstance(by, str) else by)]
+
+def _sums(df, keys):
+    """
+    Additive per-group sums (plus the per-group max risk) in one groupby pass.
+    Everything profile_stats reports is derived from these, so they can be merged incrementally.
+    """
+    classes, probs = _class_matrix(df)
+    rows = np.arange(len(df))
+    best = probs.argmax(axis=1)
+    confidence = probs[rows, best]
+    risk = probs @ np.array([RISK_WEIGHTS.get(cls, 0.0) for cls in classes])
+
+    columns = {'tweets': np.ones(len(df)), 'confidence': confidence, 'risk': risk, 'peak_risk': risk}
+    for i, cls in enumerate(classes):
+        columns[f"label_{cls}"] = (best == i).astype(float)
+        columns[f"prob_{cls}"] = probs[:, i]
+        columns[f"wprob_{cls}"] = probs[:, i] * confidence
+    frame = pd.DataFrame(columns, index=df.index)
+    aggregations = {column: 'max' if column == 'peak_risk' else 'sum' for column in frame.columns}
+    return frame.groupby(keys, sort=False).agg(aggregations)
+
+def _finalize(sums):
+    """
+    Turns group sums into shares, means, confidence-weighted scores, risk and diagnosis.
+    """
+    classes = [c[len('label_'):] for c in sums.columns if c.startswith('label_')]
+    tweets = sums['tweets'].to_numpy()
+    counts = sums[[f"label_{cls}" for cls in classes]].to_numpy()
+    confidence_sum = sums['confidence'].to_numpy()
+
+    shares = counts / tweets[:, None]
+    mean_probs = sums[[f"prob_{cls}" for cls in classes]].to_numpy() / tweets[:, None]
+    # Confidence-weighted: confident tweets count more than borderline ones
+    weighted = sums[[f"wprob_{cls}" for cls in classes]].to_numpy() / np.where(confidence_sum > 0, confidence_sum, 1)[:, None]
+
+    stats = pd.DataFrame(index=sums.index)
+    stats['tweets'] = tweets.astype(int)
+    for i, cls in enumerate(classes):
+        stats[f"share_{cls}"] = shares[:, i]
+    for i, cls in enumerate(classes):
+        stats[f"mean_prob_{cls}"] = mean_probs[:, i]
+    for i, cls in enumerate(classes):
+        stats[f"weighted_{cls}"] = weighted[:, i]
+    stats['confidence'] = confidence_sum / tweets
+    stats['risk_score'] = sums['risk'].to_numpy() / tweets
+    stats['peak_risk'] = sums['peak_risk'].to_numpy()
+
+    top_class = np.asarray(classes, dtype=object)[counts.argmax(axis=1)] if classes else np.full(len(sums), None)
+    share = dict(zip(classes, shares.T))
+    zero = np.zeros(len(sums))
+    alert = share.get(ALERT_CLASS, zero) > 0
+    conditions = [alert] + [share.get(cls, zero) > threshold for cls, threshold in DOMINANT_THRESHOLDS]
+    choices = [ALERT_CLASS] + [cls for cls, _ in DOMINANT_THRESHOLDS]
+    stats['top_class'] = top_class
+    stats['alert'] = alert
+    stats['diagnosis'] = np.select(conditions, choices, default=top_class)
+    return stats
+
+def _single(stats):
+    row = stats.iloc[0]
+    row.name = None
+    return row
+
+def profile_stats(df, by=None):
+    """
+    Per-profile statistics in one vectorized pass over an analyze_profile frame.
+    by: column(s) identifying the profile (e.g. 'username') to score many profiles at once;
+    without it the whole frame is one profile and a single row (Series) is returned.
+    Columns: tweets, share_<class> (argmax share), mean_prob_<class>, weighted_<class>
+    (confidence-weighted mean probability), confidence, risk_score (mean expected severity),
+    peak_risk, top_class, alert and diagnosis.
+    Frames analyzed with class_probabilities=True use the full probability matrix.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame() if by is not None else None
+    stats = _finalize(_sums(df, _group_keys(df, by)))
+    return _single(stats) if by is None else stats
+
+def risk_trend(df, freq='W', by=None):
+    """
+    profile_stats per time window of the 'date' column (pandas offset alias: 'D', 'W', 'M'...),
+    with 'risk_change' against the previous window of the same profile.
+    Index: window start, or (profile, window start) with by. Tweets without a date are skipped.
+    """
+    if df is None or df.empty or 'date' not in df.columns:
+        return pd.DataFrame()
+    dates = parse_dates(df['date'].to_numpy())
+    dates.index = df.index
+    valid = dates.notna()
+    if not valid.any():
+        return pd.DataFrame()
+    df = df[valid]
+    window = dates[valid].dt.to_period(freq).dt.start_time.rename('window')
+
+    keys = _group_keys(df, by) + [window]
+    trend = _finalize(_sums(df, keys)).sort_index()
+    profile_levels = list(range(len(keys) - 1))
+    trend['risk_change'] = trend.groupby(level=profile_levels, sort=False)['risk_score'].diff()
+    if by is None:
+        trend = trend.droplevel(0)
+    return trend
+
+class ProfileAggregator:
+    """
+    Running per-profile statistics. update() folds new analyzed tweets into per-profile
+    sums (the tweets themselves are not kept), so stats() after several updates equals
+    profile_stats() over all of them at once.
+    """
+    def __init__(self, by=None):
+        self.by = by
+        self.sums = None
+
+    def update(self, df):
+        if df is None or df.empty:
+            return self
+        new = _sums(df, _group_keys(df, self.by))
+        if self.sums is None:
+            self.sums = new
+        else:
+            combined = pd.concat([self.sums, new])
+            aggregations = {column: 'max' if column == 'peak_risk' else 'sum' for column in combined.columns}
+            levels = list(range(combined.index.nlevels))
+            # Classes missing on one side come in as NaN; sum/max skip them
+            self.sums = combined.groupby(level=levels, sort=False).agg(aggregations).fillna(0.0)
+        return self
+
+    def stats(self):
+        if self.sums is None:
+            return pd.DataFrame() if self.by is not None else None
+        stats = _finalize(self.sums)
+        return _single(stats) if self.by is None else stats
@@ -4,92 +4,195 @@ import asyncio
 import pandas as pd
 import os
 import json
+import time
+from src.metrics import METRICS, stage
+from src.records import tweet_frame
 
-async def scrape_profile_with_login(target_username, auth_info=None, cookies_path=None):
+_cookies_cache = {}
+
+def load_cookies(cookies_path):
     """
-    Scrapes tweets using Twikit (Authenticated).
+    Parses cookies.json into a {name: value} dict.
+    Parsed cookies are cached per (path, mtime), so repeated scans skip the JSON parse.
+    """
+    mtime = os.path.getmtime(cookies_path)
+    cached = _cookies_cache.get(cookies_path)
+    if cached and cached[0] == mtime:
+        return dict(cached[1])
+
+    print(f"Loading cookies from {cookies_path}")
+    with open(cookies_path, 'r', encoding='utf-8') as f:
+        cookies_data = json.load(f)
+
+    cookies_dict = {}
+    if isinstance(cookies_data, list):
+        print("Converting EditThisCookie (List) to internal format...")
+        for c in cookies_data:
+            cookies_dict[c['name']] = c['value']
+    elif isinstance(cookies_data, dict):
+        cookies_dict = cookies_data
+
+    _cookies_cache[cookies_path] = (mtime, cookies_dict)
+    return dict(cookies_dict)
+
+async def login_client(auth_info=None, cookies_path=None):
+    """
+    Builds an authenticated twikit Client.
     auth_info: dict containing 'username', 'email', 'password' (Optional if cookies provided)
     cookies_path: str (Path to cookies.json)
     """
     client = Client('en-US')
-    
+
+    # Prioritize Cookies if provided
+    if cookies_path and os.path.exists(cookies_path):
+        cookies_dict = load_cookies(cookies_path)
+
+        # Set cookies directly (bypassing load_cookies file expectation)
+        client.set_cookies(cookies_dict)
+        print("Cookies set successfully.")
+
+    elif auth_info:
+        print("Attempting password login...")
+        await client.login(
+            auth_info_1=auth_info['username'],
+            auth_info_2=auth_info['email'],
+            password=auth_info['password']
+        )
+    else:
+        raise ValueError("No credentials or cookies provided")
+
+    return client
+
+def note_rate_limit(error, rate_limiter):
+    """
+    If twikit reported a rate-limit window (TooManyRequests.rate_limit_reset),
+    pause the shared limiter until it resets.
+    """
+    reset = getattr(error, 'rate_limit_reset', None)
+    if reset and rate_limiter is not None and hasattr(rate_limiter, 'pause'):
+        wait = max(0, reset - time.time())
+        print(f"Rate limited; pausing requests for {wait:.0f}s")
+        rate_limiter.pause(wait)
+
+async def _wait_for_rate_limit(rate_limiter):
+    if rate_limiter:
+        with stage('rate_limit_wait'):
+            await rate_limiter.acquire()
+
+def tweets_to_frame(tweets):
+    """
+    Keeps only the fields the pipeline uses, as typed columns, so Tweet objects can be dropped.
+    """
+    return tweet_frame(
+        [tweet.text for tweet in tweets],
+        [tweet.created_at for tweet in tweets],
+        [tweet.id for tweet in tweets]
+    )
+
+async def iter_tweet_pages(target_username, auth_info=None, cookies_path=None, target_count=200,
+                           client=None, rate_limiter=None, since_id=None, status=None):
+    """
+    Async generator yielding one DataFrame ('text', 'date', 'id') per page of tweets,
+    as soon as twikit returns it. At most one page of Tweet objects is alive at a time.
+    Login and user lookup errors are raised; pagination errors just end the stream.
+    client: an already authenticated Client to reuse (skips login)
+    rate_limiter: object with an async acquire(), awaited before every API request
+    since_id: only yield tweets newer than this id and stop paginating once it is reached.
+    target_count doesn't apply then: every tweet since the checkpoint is fetched, so an
+    incremental scan never leaves a gap behind its new checkpoint
+    status: optional dict; 'complete' is set to True once the stream reached since_id or the
+    end of the timeline, False if it stopped early (target_count or a pagination error)
+    """
+    if status is None:
+        status = {}
+    status['complete'] = False
+    if client is None:
+        with stage('login'):
+            client = await login_client(auth_info, cookies_path)
+
     try:
-        # Prioritize Cookies if provided
-        if cookies_path and os.path.exists(cookies_path):
-            print(f"Loading cookies from {cookies_path}")
-            
-            with open(cookies_path, 'r', encoding='utf-8') as f:
-                cookies_data = json.load(f)
-            
-            cookies_dict = {}
-            if isinstance(cookies_data, list):
-                print("Converting EditThisCookie (List) to internal format...")
-                for c in cookies_data:
-                    cookies_dict[c['name']] = c['value']
-            elif isinstance(cookies_data, dict):
-                cookies_dict = cookies_data
-            
-            # Set cookies directly (bypassing load_cookies file expectation)
-            client.set_cookies(cookies_dict)
-            print("Cookies set successfully.")
-                
-        elif auth_info:
-            print("Attempting password login...")
-            await client.login(
-                auth_info_1=auth_info['username'],
-                auth_info_2=auth_info['email'],
-                password=auth_info['password']
-            )
-        else:
-            raise ValueError("No credentials or cookies provided")
-        
         # Get User
         print(f"Fetching user: {target_username}...")
-        user = await client.get_user_by_screen_name(target_username)
-        
+        await _wait_for_rate_limit(rate_limiter)
+        with stage('scrape'):
+            user = await client.get_user_by_screen_name(target_username)
+
         # Get Tweets
-        target_count = 200
         print(f"Fetching tweets (Target: {target_count})...")
-        tweets = await user.get_tweets('Tweets', count=20)
-        
-        all_tweets = []
-        if tweets:
-            all_tweets.extend(tweets)
-            
-            # Pagination Loop
-            while len(all_tweets) < target_count:
-                print(f"Accumulated {len(all_tweets)} tweets. Fetching more...")
-                try:
-                    more_tweets = await tweets.next()
-                    if not more_tweets:
-                        print("No more tweets available.")
-                        break
-                    all_tweets.extend(more_tweets)
-                    
-                    # Safety break to avoid infinite loops if something gets stuck
-                    if len(more_tweets) == 0:
-                        break
-                        
-                except Exception as e:
-                    print(f"Pagination error (stopping fetch): {e}")
-                    break
-        
-        # Trim to target_count
-        all_tweets = all_tweets[:target_count]
-        print(f"Total tweets fetched: {len(all_tweets)}")
-
-        results = []
-        for tweet in all_tweets:
-            results.append({
-                'text': tweet.text,
-                'date': tweet.created_at,
-                'id': tweet.id
-            })
-                
-        return pd.DataFrame(results)
+        await _wait_for_rate_limit(rate_limiter)
+        with stage('scrape'):
+            tweets = await user.get_tweets('Tweets', count=20)
+    except Exception:
+        METRICS.inc('errors', stage='scrape')
+        raise
+
+    fetched = 0
+    while tweets:
+        page = list(tweets)
+        METRICS.inc('pages_fetched')
+        # Pages are newest first; once the oldest tweet on a page is already known,
+        # everything after it was processed by an earlier scan
+        reached_checkpoint = since_id is not None and int(page[-1].id) <= since_id
+        if since_id is not None:
+            page = [tweet for tweet in page if int(tweet.id) > since_id]
+
+        # Trim to target_count (full scans only)
+        if since_id is None:
+            page = page[:target_count - fetched]
+        fetched += len(page)
+        METRICS.inc('tweets', len(page), stage='scrape')
+        if page:
+            yield tweets_to_frame(page)
+        del page
+
+        if reached_checkpoint:
+            print(f"Reached checkpoint (id {since_id}). Stopping fetch.")
+            status['complete'] = True
+            break
+        if since_id is None and fetched >= target_count:
+            break
+
+        print(f"Accumulated {fetched} tweets. Fetching more...")
+        try:
+            await _wait_for_rate_limit(rate_limiter)
+            with stage('scrape'):
+                tweets = await tweets.next()
+        except Exception as e:
+            print(f"Pagination error (stopping fetch): {e}")
+            METRICS.inc('errors', stage='scrape')
+            note_rate_limit(e, rate_limiter)
+            break
+        # Safety break to avoid infinite loops if something gets stuck
+        if not tweets or len(tweets) == 0:
+            print("No more tweets available.")
+            status['complete'] = True
+            break
+    else:
+        status['complete'] = True # Empty timeline
+
+    print(f"Total tweets fetched: {fetched}")
+
+async def scrape_profile_with_login(target_username, auth_info=None, cookies_path=None, target_count=200,
+                                    client=None, rate_limiter=None, since_id=None, status=None):
+    """
+    Scrapes tweets using Twikit (Authenticated).
+    auth_info: dict containing 'username', 'email', 'password' (Optional if cookies provided)
+    cookies_path: str (Path to cookies.json)
+    client / rate_limiter / since_id / status: see iter_tweet_pages
+    """
+    try:
+        pages = [
+            page async for page in iter_tweet_pages(
+                target_username, auth_info, cookies_path, target_count, client, rate_limiter, since_id, status
+            )
+        ]
+        if not pages:
+            return tweet_frame([], [], [])
+        return pd.concat(pages, ignore_index=True)
 
     except Exception as e:
         print(f"Twikit Error: {e}")
+        note_rate_limit(e, rate_limiter)
         return None
 
 # Helper wrapper for Streamlit (since it's sync by default often)
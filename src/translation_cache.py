@@ -0,0 +1,203 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = "cache/translations.sqlite"
+
+def make_key(text, source, target):
+    """
+    Builds the cache key: hash of the normalized text plus the language pair.
+    Normalization collapses whitespace and case so retweets/copypasta share a key.
+    """
+    normalized = " ".join(str(text).split()).lower()
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return f"{source}:{target}:{digest}"
+
+class LRUCache:
+    """
+    Small in-process LRU with optional TTL. Values are stored with their insert time.
+    """
+    def __init__(self, max_entries=10000, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, stored_at = item
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, stored_at=None):
+        self._data[key] = (value, stored_at if stored_at is not None else time.time())
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class TranslationCache:
+    """
+    Two-tier translation cache: in-process LRU backed by a SQLite file.
+    Both tiers evict by size (max entries) and by age (ttl_seconds).
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=10000,
+                 disk_entries=500000, ttl_seconds=30 * 24 * 3600):
+        self.path = path
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(memory_entries, ttl_seconds)
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_prune = 0
+
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_accessed ON translations(accessed_at)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # Disk tier is best effort; keep working with the memory tier only
+                print(f"Translation cache disabled on disk ({path}): {e}")
+                self._conn = None
+
+    def get(self, text, source='auto', target='en'):
+        key = make_key(text, source, target)
+        with self._lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats['memory_hits'] += 1
+                return value
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if row is not None:
+                    value, created_at = row
+                    if self.ttl_seconds is None or now - created_at <= self.ttl_seconds:
+                        self._conn.execute(
+                            "UPDATE translations SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._conn.commit()
+                        self.memory.set(key, value, created_at)
+                        self.stats['disk_hits'] += 1
+                        return value
+                    self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats['evictions'] += 1
+
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, text, value, source='auto', target='en'):
+        key = make_key(text, source, target)
+        now = time.time()
+        with self._lock:
+            self.memory.set(key, value, now)
+            self.stats['writes'] += 1
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)", (key, value, now, now)
+            )
+            self._conn.commit()
+            # Pruning scans the table, so only do it every few hundred writes
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 500:
+                self._prune()
+
+    def _prune(self):
+        """
+        Drops expired rows, then the least recently accessed rows over disk_entries.
+        Caller must hold the lock.
+        """
+        self._writes_since_prune = 0
+        removed = 0
+        if self.ttl_seconds is not None:
+            cur = self._conn.execute(
+                "DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            removed += cur.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        if count > self.disk_entries:
+            cur = self._conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.disk_entries,)
+            )
+            removed += cur.rowcount
+        self._conn.commit()
+        self.stats['evictions'] += removed
+
+    def prune(self):
+        with self._lock:
+            if self._conn is not None:
+                self._prune()
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM translations")
+                self._conn.commit()
+
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_translation_cache():
+    """
+    Returns the process-wide cache. TRANSLATION_CACHE_PATH overrides the file
+    location; set it to an empty string to keep the cache in memory only.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            path = os.environ.get("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH)
+            _default_cache = TranslationCache(path or None)
+        return _default_cache
+
+def set_translation_cache(cache):
+    """
+    Replaces the process-wide cache. Returns the previous one (None if it wasn't created yet).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        previous, _default_cache = _default_cache, cache
+        return previous
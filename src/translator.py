@@ -0,0 +1,213 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from bs4 import BeautifulSoup
+from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests, TranslationNotFound
+from deep_translator.validate import is_input_valid
+from src.metrics import METRICS, stage
+from src.translation_cache import get_translation_cache
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10.0 # Seconds per translation call
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5 # Base delay in seconds, doubled on each retry
+
+class Translator:
+    """
+    Backend interface: translate a single text from source to target language.
+    timeout: seconds the call may take; backends raise TimeoutError when it runs out.
+    Implementations must be safe to call from several threads at once.
+    """
+    name = "base"
+
+    def translate(self, text, source='auto', target='en', timeout=None):
+        raise NotImplementedError
+
+class GoogleBackend(Translator):
+    """
+    Google Translate via deep_translator's GoogleTranslator (language codes, URL, page layout),
+    with the HTTP request made here: GoogleTranslator calls requests.get without a timeout,
+    so a stalled connection would hold its thread indefinitely.
+    One translator and one requests.Session per thread and language pair.
+    """
+    name = "google"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _translator(self, source, target):
+        translators = getattr(self._local, 'translators', None)
+        if translators is None:
+            translators = self._local.translators = {}
+            self._local.session = requests.Session()
+        key = (source, target)
+        if key not in translators:
+            translators[key] = GoogleTranslator(source=source, target=target)
+        return translators[key]
+
+    def translate(self, text, source='auto', target='en', timeout=None):
+        translator = self._translator(source, target)
+        if not is_input_valid(text, max_chars=5000):
+            return text
+        text = text.strip()
+        if not text or translator._same_source_target():
+            return text
+
+        params = {'sl': translator._source, 'tl': translator._target, translator.payload_key: text}
+        try:
+            with self._local.session.get(translator._base_url, params=params, timeout=timeout) as response:
+                if response.status_code == 429:
+                    raise TooManyRequests()
+                if response.status_code != 200:
+                    raise RequestError()
+                soup = BeautifulSoup(response.text, "html.parser")
+        except requests.exceptions.Timeout as e:
+            raise TimeoutError(f"Translation request timed out after {timeout}s") from e
+
+        element = (soup.find(translator._element_tag, translator._element_query)
+                   or soup.find(translator._element_tag, translator._alt_element_query))
+        if not element:
+            raise TranslationNotFound(text)
+        return element.get_text(strip=True)
+
+class IdentityBackend(Translator):
+    """
+    Returns the text unchanged. Useful offline and when input is already English.
+    """
+    name = "identity"
+
+    def translate(self, text, source='auto', target='en', timeout=None):
+        return text
+
+class FakeBackend(Translator):
+    """
+    Local stand-in for benchmarking: looks words up in a dictionary and sleeps
+    to simulate network latency. failure_rate makes calls raise at random.
+    """
+    name = "fake"
+
+    def __init__(self, dictionary=None, latency=0.05, jitter=0.0, failure_rate=0.0, seed=None):
+        self.dictionary = dictionary or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate(self, text, source='auto', target='en', timeout=None):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Simulated translation timeout after {timeout}s")
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise ConnectionError("Simulated translation failure")
+        return " ".join(self.dictionary.get(word, word) for word in str(text).split())
+
+BACKENDS = {
+    'google': GoogleBackend,
+    'identity': IdentityBackend,
+    'fake': FakeBackend,
+}
+
+_backend = None
+
+def get_backend():
+    """
+    Returns the active backend. TRANSLATOR_BACKEND selects it (default: google).
+    """
+    global _backend
+    if _backend is None:
+        name = os.environ.get("TRANSLATOR_BACKEND", "google")
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown translator backend '{name}'. Options: {list(BACKENDS)}")
+        _backend = BACKENDS[name]()
+    return _backend
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+def _translate_with_retry(backend, text, source, target, retries, backoff, timeout=None):
+    for attempt in range(retries + 1):
+        try:
+            return backend.translate(text, source=source, target=target, timeout=timeout)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            reason = f"timed out after {timeout:.1f}s" if isinstance(e, TimeoutError) else e
+            delay = backoff * (2 ** attempt)
+            print(f"Translation error (retry {attempt + 1}/{retries} in {delay:.2f}s): {reason}")
+            time.sleep(delay)
+
+def translate_batch(texts, target='en', source='auto', backend=None, cache=None,
+                    concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                    retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Translates a list of texts concurrently. Returns translations in input order.
+    Cached and duplicate texts are only translated once; failures and timeouts
+    fall back to the original text.
+    """
+    texts = list(texts)
+    if backend is None:
+        backend = get_backend()
+    if cache is None:
+        cache = get_translation_cache()
+
+    results = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        cached = cache.get(text, source, target)
+        if cached is not None:
+            results[text] = cached
+        else:
+            pending.append(text)
+    METRICS.inc('translation_cache_hits', len(results))
+    METRICS.inc('translation_cache_misses', len(pending))
+
+    if pending:
+        with stage('translate'):
+            _translate_pending(pending, results, backend, source, target, cache,
+                               concurrency, timeout, retries, backoff)
+
+    return [results[text] for text in texts]
+
+def _translate_pending(pending, results, backend, source, target, cache, concurrency, timeout, retries, backoff):
+    """
+    Translates the uncached texts on a thread pool, filling results in place.
+    The backend enforces timeout on each request, so a stalled call costs one text at most
+    (timeout + backoff) * (retries + 1) and every worker is free again when the batch ends.
+    """
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(pending))) as executor:
+        futures = {
+            executor.submit(_translate_with_retry, backend, text, source, target, retries, backoff, timeout): text
+            for text in pending
+        }
+        for future, text in futures.items():
+            try:
+                translated = future.result()
+            except TimeoutError:
+                print(f"Translation timed out after {retries + 1} attempts of {timeout:.1f}s")
+                METRICS.inc('errors', stage='translate_timeout')
+                results[text] = text # Fallback to original text
+                continue
+            except Exception as e:
+                print(f"Translation error: {e}")
+                METRICS.inc('errors', stage='translate')
+                results[text] = text # Fallback to original text
+                continue
+            if translated is None:
+                results[text] = text
+                continue
+            cache.set(text, translated, source, target)
+            METRICS.inc('translations')
+            results[text] = translated
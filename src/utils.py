@@ -1,66 +1,206 @@
 
-from deep_translator import GoogleTranslator
+import numpy as np
 import pandas as pd
 import re
+from src.metrics import METRICS, stage
+from src.records import compact_results
+from src.text_normalizer import clean_series, clean_text
+from src.translator import translate_batch
 
-def clean_text(text):
-    text = str(text).lower()
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE) # Remove URLs
-    text = re.sub(r'@\w+', '', text) # Remove Mentions
-    text = re.sub(r'[^a-zA-Z\s]', '', text) # Remove strict special chars
-    return text
+# Rows per predict_proba call; bounds the size of the sparse feature matrix
+DEFAULT_CHUNK_SIZE = 1000
+# Per-class probability columns are named PROBABILITY_PREFIX + class (e.g. 'prob_Depression')
+PROBABILITY_PREFIX = 'prob_'
 
-def translate_text(text, target='en'):
+# Small stopword lists for language identification. Only very frequent function
+# words are listed; ones that are also English words ("a", "do", "die") are left out.
+STOPWORDS = {
+    'en': {'the', 'and', 'is', 'are', 'was', 'i', 'you', 'to', 'of', 'it', 'my', 'me', 'this',
+           'that', 'in', 'for', 'with', 'have', 'be', 'just', 'not', 'what', 'so', 'but',
+           'im', "i'm", 'dont', "don't", 'can', 'will', 'do', 'all', 'on', 'at', 'they', 'we',
+           'he', 'she', 'your', 'like', 'want', 'feel', 'get', 'its', "it's", 'am'},
+    'pt': {'que', 'não', 'nao', 'uma', 'um', 'eu', 'você', 'voce', 'vc', 'mas', 'com', 'para',
+           'pra', 'por', 'mais', 'isso', 'muito', 'tá', 'ta', 'está', 'esta', 'meu', 'minha',
+           'da', 'dos', 'das', 'em', 'ao', 'os', 'as', 'é', 'sim', 'ele', 'ela', 'tudo',
+           'quero', 'estou', 'tô', 'já', 'só', 'também', 'nem', 'quando', 'bem'},
+    'es': {'que', 'el', 'la', 'los', 'las', 'y', 'es', 'por', 'con', 'para', 'pero', 'mi',
+           'yo', 'tú', 'tu', 'muy', 'está', 'estoy', 'como', 'más', 'del', 'al', 'lo', 'una',
+           'quiero', 'también', 'ya', 'sí', 'cuando', 'todo', 'nada', 'porque', 'hoy'},
+    'fr': {'le', 'la', 'les', 'et', 'est', 'je', 'tu', 'il', 'elle', 'pas', 'que', 'qui',
+           'dans', 'pour', 'avec', 'une', 'un', 'des', 'du', 'mais', 'moi', 'mon', 'ma',
+           'suis', 'ce', 'cest', "c'est", 'très', 'sur', 'au', 'aux', 'vous', 'nous'},
+    'de': {'der', 'das', 'und', 'ist', 'ich', 'nicht', 'du', 'es', 'sie', 'ein',
+           'eine', 'zu', 'mit', 'auf', 'für', 'aber', 'mein', 'mich', 'mir', 'auch', 'wie',
+           'noch', 'wenn', 'bin', 'den', 'dem', 'von', 'sehr', 'heute'},
+}
+LANGUAGE_WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+NOISE_PATTERN = re.compile(r'http\S+|www\S+|https\S+|@\w+')
+
+def strip_noise(text):
     """
-    Translates text to target language (default English) using deep_translator.
+    Removes URLs and mentions but keeps accents, case and punctuation for the translator.
     """
-    try:
-        # Simple caching or batching could be added here for performance
-        translated = GoogleTranslator(source='auto', target=target).translate(text)
-        return translated
-    except Exception as e:
-        print(f"Translation error: {e}")
-        return text # Fallback to original text
+    return " ".join(NOISE_PATTERN.sub('', str(text)).split())
+
+def detect_language(text):
+    """
+    Fast local language identification by stopword ratio.
+    Returns a language code from STOPWORDS, or 'unknown' if there is no clear winner.
+    English only wins when it scores strictly higher than every other language.
+    """
+    words = LANGUAGE_WORD_PATTERN.findall(str(text).lower())
+    if not words:
+        return 'unknown'
+
+    scores = {lang: sum(word in stopwords for word in words) for lang, stopwords in STOPWORDS.items()}
+    best = max(scores.values())
+    if best == 0:
+        return 'unknown'
+    winners = [lang for lang, score in scores.items() if score == best]
+    if len(winners) > 1:
+        # Ambiguous; let the translator decide unless English isn't in the running
+        return 'unknown' if 'en' in winners else winners[0]
+    return winners[0]
+
+def prepare_texts(texts):
+    """
+    Language gate + translation + cleaning for a list of raw texts.
+    English texts skip the network; other texts are translated from the raw text
+    (with accents intact) before the ASCII-only clean_text runs.
+    Returns three lists: languages, translated texts and cleaned texts.
+    """
+    with stage('language_detect'):
+        stripped = [strip_noise(text) for text in texts]
+        languages = [
+            detect_language(text) if any(ch.isalpha() for ch in text) else 'none'
+            for text in stripped
+        ]
+    METRICS.inc('tweets', len(stripped), stage='language_detect')
+
+    to_translate = [text for text, lang in zip(stripped, languages) if lang not in ('en', 'none')]
+    translated_iter = iter(translate_batch(to_translate) if to_translate else [])
+    translated = [
+        text if lang in ('en', 'none') else next(translated_iter)
+        for text, lang in zip(stripped, languages)
+    ]
 
-def analyze_profile(df, model):
+    METRICS.inc('tweets', len(to_translate), stage='translate')
+
+    with stage('clean'):
+        cleaned = clean_series(translated).tolist()
+    METRICS.inc('tweets', len(cleaned), stage='clean')
+    return languages, translated, cleaned
+
+def translate_text(text, target='en', source='auto', cache=None, backend=None):
+    """
+    Translates text to target language (default English) using the active translator backend.
+    Results are memoized in the two-tier translation cache (memory + SQLite).
+    """
+    return translate_batch([text], target=target, source=source, cache=cache, backend=backend)[0]
+
+def predict_proba_batch(texts, model, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Full class-probability matrix for a list of texts, one predict_proba call per chunk.
+    Returns (classes, probabilities) with probabilities of shape (len(texts), len(classes)).
+    """
+    texts = list(texts)
+    classes = np.asarray(model.classes_)
+    if not texts:
+        return classes, np.empty((0, len(classes)), dtype=float)
+
+    chunks = []
+    # Chunking keeps the sparse TF-IDF matrix bounded on very large inputs
+    for start in range(0, len(texts), chunk_size):
+        with stage('model'):
+            chunks.append(model.predict_proba(texts[start:start + chunk_size]))
+    METRICS.inc('tweets', len(texts), stage='model')
+    return classes, np.vstack(chunks)
+
+def predict_batch(texts, model, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Classifies a list of texts with a single predict_proba call per chunk.
+    Returns (predictions, probabilities) as numpy arrays aligned with texts.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.array([], dtype=object), np.array([], dtype=float)
+
+    classes, probs = predict_proba_batch(texts, model, chunk_size)
+    best = probs.argmax(axis=1)
+    return classes[best], probs[np.arange(len(best)), best]
+
+def prepare_profile(df):
+    """
+    Language gate, translation and cleaning for a DataFrame of tweets (with 'text' column).
+    Returns one row per tweet that still has text after cleaning, with 'original_text',
+    'language', 'cleaned_text', 'translated_text', 'date' and (if present) 'id' columns.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    # 0. Detect language, translate non-English text, then clean (Crucial for model calibration)
+    original_texts = df['text'].tolist()
+    languages, translated_texts, cleaned_texts = prepare_texts(original_texts)
+
+    # Skip if empty after cleaning
+    keep = np.array([bool(text.strip()) for text in cleaned_texts], dtype=bool)
+    if not keep.any():
+        return pd.DataFrame()
+
+    dates = df['date'][keep] if 'date' in df.columns else ''
+
+    result = pd.DataFrame({
+        'original_text': np.asarray(original_texts, dtype=object)[keep],
+        'language': np.asarray(languages, dtype=object)[keep],
+        'cleaned_text': np.asarray(cleaned_texts, dtype=object)[keep],
+        'translated_text': np.asarray(translated_texts, dtype=object)[keep],
+        'date': dates.values if isinstance(dates, pd.Series) else dates
+    })
+    # Tweet ids let incremental scans merge new results with stored history
+    if 'id' in df.columns:
+        result['id'] = df['id'][keep].values
+    return result
+
+def add_predictions(prepared, predictions, probabilities, classes=None, class_probabilities=None):
+    """
+    Inserts 'prediction' and 'probability' after 'translated_text' in a prepare_profile frame.
+    With classes and the full class_probabilities matrix, also adds one 'prob_<class>' column per class.
+    """
+    position = prepared.columns.get_loc('translated_text') + 1
+    prepared.insert(position, 'prediction', predictions)
+    prepared.insert(position + 1, 'probability', probabilities)
+    if class_probabilities is not None:
+        for i, cls in enumerate(classes):
+            prepared.insert(position + 2 + i, f"{PROBABILITY_PREFIX}{cls}", class_probabilities[:, i])
+    return prepared
+
+def analyze_profile(df, model, chunk_size=DEFAULT_CHUNK_SIZE, class_probabilities=False, keep_intermediate=False):
     """
     Analyzes a DataFrame of tweets (with 'text' column) using the provided model.
-    Adds 'translation', 'prediction', and 'probability' columns.
+    Returns 'original_text', 'prediction' (categorical), 'probability', 'date' and 'id' columns.
+    Texts are cleaned and classified in batches of chunk_size.
+    class_probabilities: also keep the full predict_proba matrix as 'prob_<class>' columns
+    (used by src.risk_scoring).
+    keep_intermediate: also keep 'language', 'cleaned_text' and 'translated_text'.
+    Raises if there is no model or the prediction fails, so callers can tell a failed
+    analysis from a profile whose tweets were all dropped during cleaning (empty frame).
     """
     if model is None:
-        print("Error: Model is None in analyze_profile")
-        return pd.DataFrame()
+        raise ValueError("Model is None in analyze_profile")
+
+    prepared = prepare_profile(df)
+    if prepared.empty:
+        return prepared
+
+    # 2. Predict (one vectorizer transform and one classifier pass per chunk)
+    try:
+        classes, probs = predict_proba_batch(prepared['cleaned_text'].tolist(), model, chunk_size)
+    except Exception as e:
+        print(f"Prediction error for batch: {e}")
+        METRICS.inc('errors', stage='model')
+        raise
 
-    results = []
-    
-    # Analyze each tweet
-    for index, row in df.iterrows():
-        original_text = row['text']
-        
-        # 0. Clean (Crucial for model calibration)
-        cleaned_text = clean_text(original_text)
-        
-        # Skip if empty after cleaning
-        if not cleaned_text.strip():
-            continue
-
-        # 1. Translate
-        translated_text = translate_text(cleaned_text)
-        
-        # 2. Predict
-        try:
-            pred_class = model.predict([translated_text])[0]
-            pred_prob = model.predict_proba([translated_text])[0].max()
-            
-            results.append({
-                'original_text': original_text,
-                'cleaned_text': cleaned_text,
-                'translated_text': translated_text,
-                'prediction': pred_class,
-                'probability': pred_prob,
-                'date': row.get('date', '')
-            })
-        except Exception as e:
-            print(f"Prediction error for tweet: {e}")
-            
-    return pd.DataFrame(results)
+    best = probs.argmax(axis=1)
+    analyzed = add_predictions(prepared, classes[best], probs[np.arange(len(best)), best],
+                               classes, probs if class_probabilities else None)
+    return compact_results(analyzed, keep_intermediate)
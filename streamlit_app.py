@@ -1,11 +1,16 @@
 
 import streamlit as st
-import joblib
 import pandas as pd
 import plotly.express as px
-import os
-from src.scraper import run_scrape
-from src.utils import analyze_profile, translate_text
+import time
+from contextlib import nullcontext
+from src.metrics import profile_scan, track_scan
+from src.model_registry import ModelRegistry
+from src.pipeline import stream_profile_analysis
+from src.records import compact_results
+from src.result_cache import ResultCache, profile_key, text_key
+from src.risk_scoring import profile_stats, risk_trend
+from src.utils import analyze_profile, prepare_texts
 
 # Page Config
 st.set_page_config(
@@ -15,21 +20,35 @@ st.set_page_config(
 )
 
 # Load Model
-@st.cache_resource(ttl=300) # Access cache for 5 minutes, enables reloading if file appears
-def load_model():
-    model_path = "models/mental_health_model.pkl"
-    # Force check file existence every time not cached
-    if not os.path.exists(model_path):
-        print("Model file not found.")
-        return None
-    print(f"Loading model from {model_path}...")
-    return joblib.load(model_path)
-
-model = load_model()
+@st.cache_resource # One registry per server process; it reloads the model only when the file changes
+def get_model_registry():
+    return ModelRegistry()
+
+model_registry = get_model_registry()
+model = model_registry.get()
+
+# Finished results shared by all sessions (bounded LRU); each session keeps its own
+# latest results in st.session_state so reruns redraw them without recomputing
+@st.cache_resource
+def get_result_caches():
+    return ResultCache(max_entries=64), ResultCache(max_entries=2048)
+
+profile_cache, phrase_cache = get_result_caches()
+RECENT_SCAN_SECONDS = 60 # Repeat scans of the same profile within this window skip X entirely
 
 # Title
 st.title("🧠 Análise de Saúde Mental (Twikit Edition)")
 
+# Active model version
+model_info = model_registry.info()
+model_version = model_info['version'] if model_info else None
+if model_info:
+    st.sidebar.caption(
+        f"Modelo {model_info['version']} ({model_info['kind']}) · "
+        f"carregado em {model_info['load_seconds']:.2f}s · "
+        f"{time.strftime('%d/%m %H:%M:%S', time.localtime(model_info['loaded_at']))}"
+    )
+
 # Sidebar for Credentials
 # Sidebar for Credentials
 st.sidebar.header("🔐 Autenticação X (Twitter)")
@@ -63,6 +82,70 @@ else:
     else:
         st.sidebar.warning("Preencha todos os campos.")
 
+# Diagnostics
+enable_profiling = st.sidebar.checkbox(
+    "Perfilar varredura (cProfile)", value=False,
+    help="Cobre a busca de tweets (event loop) e a análise de cada página (limpeza, tradução, modelo). "
+         "Chamadas de rede da tradução rodam em threads próprias e aparecem só como espera."
+)
+
+# Results dashboard (scraped and manual profiles)
+CLASS_COLORS = {
+    "Normal": "#2ecc71",
+    "Suicidal": "#e74c3c",
+    "Depression": "#e67e22",
+    "Anxiety": "#f1c40f",
+    "Bipolar": "#9b59b6",
+    "Stress": "#34495e"
+}
+DIAGNOSIS_LABELS = {
+    "Suicidal": "⚠️ Risco de Suicídio Detectado",
+    "Depression": "Depressão (Tendência Dominante)",
+    "Anxiety": "Ansiedade (Tendência Dominante)"
+}
+
+def render_dashboard(df_analyzed, key="dashboard"):
+    if df_analyzed is None or df_analyzed.empty:
+        st.warning("Nenhum tweet com texto para analisar.")
+        return
+
+    # All profile metrics come from one vectorized pass over the probability matrix
+    stats = profile_stats(df_analyzed)
+    st.divider()
+
+    # 1. Overview Metrics (With Severity Logic)
+    if stats['alert']:
+        st.error("🚨 ALERTA: Este perfil contém indícios de Comportamento Suicida.")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Tweets Analisados", int(stats['tweets']))
+    m2.metric("Diagnóstico do Perfil", DIAGNOSIS_LABELS.get(stats['diagnosis'], stats['diagnosis']))
+    m3.metric("Confiança Média", f"{stats['confidence']:.1%}")
+    m4.metric("Índice de Risco", f"{stats['risk_score']:.2f}")
+
+    # 2. Breakdown Chart
+    st.subheader("Distribuição de Sentimentos")
+    shares = stats[[c for c in stats.index if c.startswith('share_')]]
+    counts_df = pd.DataFrame({
+        'Categoria': [c[len('share_'):] for c in shares.index],
+        'Contagem': (shares.astype(float) * stats['tweets']).round().astype(int).values
+    })
+    counts_df = counts_df[counts_df['Contagem'] > 0]
+    fig_pie = px.pie(counts_df, values='Contagem', names='Categoria', hole=0.4,
+                     color='Categoria', color_discrete_map=CLASS_COLORS)
+    st.plotly_chart(fig_pie, use_container_width=True, key=f"{key}_pie")
+
+    # 3. Risk over time
+    trend = risk_trend(df_analyzed, freq='W')
+    if len(trend) > 1:
+        st.subheader("Tendência de Risco (semanal)")
+        st.plotly_chart(px.line(trend.reset_index(), x='window', y='risk_score', markers=True,
+                                labels={'window': 'Semana', 'risk_score': 'Índice de Risco'}),
+                        use_container_width=True, key=f"{key}_trend")
+
+    # Display raw data
+    st.subheader("Tweets Analisados")
+    st.dataframe(df_analyzed[[c for c in ['date', 'original_text', 'prediction', 'probability'] if c in df_analyzed.columns]])
+
 # Tabs
 tab1, tab2 = st.tabs(["📝 Análise de Frase", "👤 Análise de Perfil (Login Required)"])
 
@@ -77,18 +160,26 @@ with tab1:
             st.warning("Digite algo.")
         else:
             with st.spinner("Analisando..."):
-                translated = translate_text(user_input)
-                prediction_class = model.predict([translated])[0]
-                prediction_probs = model.predict_proba([translated])[0]
-                classes = model.classes_
-                
-                c1, c2 = st.columns(2)
-                with c1:
-                    st.success(f"Original: {user_input}")
-                    st.metric("Resultado", prediction_class)
-                with c2:
-                    prob_df = pd.DataFrame({'Categoria': classes, 'Probabilidade': prediction_probs})
-                    st.plotly_chart(px.bar(prob_df, x='Probabilidade', y='Categoria', orientation='h'), use_container_width=True)
+                def classify_phrase():
+                    _, _, cleaned = prepare_texts([user_input])
+                    return {'classes': list(model.classes_), 'probs': model.predict_proba([cleaned[0]])[0]}
+                result = phrase_cache.get_or_compute(text_key(user_input, model_version), classify_phrase)
+                st.session_state['phrase_result'] = {'text': user_input, **result}
+
+    # Rendered from session state so other widgets' reruns keep the result on screen
+    phrase_result = st.session_state.get('phrase_result')
+    if phrase_result:
+        prediction_probs = phrase_result['probs']
+        classes = phrase_result['classes']
+        prediction_class = classes[prediction_probs.argmax()]
+        
+        c1, c2 = st.columns(2)
+        with c1:
+            st.success(f"Original: {phrase_result['text']}")
+            st.metric("Resultado", prediction_class)
+        with c2:
+            prob_df = pd.DataFrame({'Categoria': classes, 'Probabilidade': prediction_probs})
+            st.plotly_chart(px.bar(prob_df, x='Probabilidade', y='Categoria', orientation='h'), use_container_width=True)
 
 # --- TAB 2 ---
 with tab2:
@@ -107,114 +198,113 @@ with tab2:
             if not model:
                 st.error("⚠️ Modelo de Machine Learning não encontrado. Verifique se o arquivo .pkl foi enviado ao GitHub.")
                 st.stop()
-            
-            with st.status("Autenticando e Buscando Tweets...", expanded=True) as status:
-                st.write("Conectando ao Twitter...")
+
+            previous = st.session_state.get('profile_result')
+            if (previous and previous['username'].lower() == target_user.lower()
+                    and previous['model_version'] == model_version
+                    and time.time() - previous['scanned_at'] < RECENT_SCAN_SECONDS):
+                # Same profile just scanned: don't even ask X for its latest tweet
+                st.info(f"@{target_user} foi analisado há menos de {RECENT_SCAN_SECONDS}s; mostrando o resultado atual.")
+            else:
+                with st.status("Autenticando e Buscando Tweets...", expanded=True) as status:
+                    st.write("Conectando ao Twitter...")
+                    try:
+                        # A known latest tweet id means nothing changed: reuse the cached analysis
+                        cache_state = {}
+                        def is_cached(latest_id):
+                            cache_state['key'] = profile_key(target_user, latest_id, model_version)
+                            cache_state['result'] = profile_cache.get(cache_state['key'])
+                            return cache_state['result'] is not None
+
+                        # Stream pages: each page is analyzed while the next one is fetched
+                        tweet_pages = []
+                        analyzed_pages = []
+                        partial_results = st.empty()
+                        with track_scan() as timings, \
+                                (profile_scan() if enable_profiling else nullcontext()) as profile_result:
+                            try:
+                                pages = stream_profile_analysis(target_user, model, auth_info, cookies_file_path,
+                                                                class_probabilities=True, is_cached=is_cached)
+                                for page_df, page_analyzed in pages:
+                                    tweet_pages.append(page_df)
+                                    analyzed_pages.append(page_analyzed)
+                                    fetched = sum(len(page) for page in tweet_pages)
+                                    status.update(label=f"Analisando... {fetched} tweets baixados")
+                                    partial = pd.concat(analyzed_pages, ignore_index=True)
+                                    if not partial.empty:
+                                        partial_results.dataframe(partial[['date', 'original_text', 'prediction']])
+                            except Exception as e:
+                                print(f"Twikit Error: {e}")
+                                cache_state.pop('key', None) # Partial scan: show what was analyzed, don't cache it
+                        partial_results.empty()
+
+                        # Per-stage breakdown of this scan (stages overlap, so they can sum past the total)
+                        with st.expander(f"⏱️ Tempo por etapa ({timings['total']:.2f}s no total)"):
+                            stage_df = pd.DataFrame(
+                                [(name, seconds) for name, seconds in timings.items() if name != 'total'],
+                                columns=['Etapa', 'Segundos']
+                            ).sort_values('Segundos', ascending=False)
+                            st.bar_chart(stage_df.set_index('Etapa'))
+                            if profile_result and profile_result.get('report'):
+                                st.caption(f"cProfile de {profile_result['threads']} threads: busca (event loop) "
+                                           "e análise das páginas; a rede da tradução aparece só como espera.")
+                                st.code(profile_result['report'])
+
+                        if cache_state.get('result') is not None:
+                            status.update(label="Sem tweets novos (resultado em cache)", state="complete")
+                            st.session_state['profile_result'] = {**cache_state['result'], 'scanned_at': time.time()}
+                            st.session_state['scrape_failed'] = False
+                        elif not tweet_pages:
+                            status.update(label="Erro no Login/Busca", state="error")
+                            st.error("⚠️ O Twitter/X bloqueou o acesso automático (Cloudflare Block). Isso é comum em ferramentas de scraping.")
+                            st.session_state['scrape_failed'] = True
+                        else:
+                            status.update(label="Sucesso!", state="complete")
+                            # Analyzed page by page while streaming; pages have their own category
+                            # sets, so the concatenated frame is compacted again as a whole
+                            result = {
+                                'username': target_user,
+                                'model_version': model_version,
+                                'tweets': sum(len(page) for page in tweet_pages),
+                                'analyzed': compact_results(pd.concat(analyzed_pages, ignore_index=True)),
+                                'scanned_at': time.time(),
+                            }
+                            if 'key' in cache_state:
+                                profile_cache.set(cache_state['key'], result)
+                            st.session_state['profile_result'] = result
+                            st.session_state['scrape_failed'] = False
+
+                    except Exception as e:
+                        status.update(label="Erro Crítico", state="error")
+                        st.error(f"Ocorreu um erro: {e}")
+
+    # Last profile result survives reruns (other buttons, tab switches) without a new scan
+    profile_state = st.session_state.get('profile_result')
+    if profile_state:
+        st.success(f"Baixados {profile_state['tweets']} tweets de @{profile_state['username']}.")
+        render_dashboard(profile_state['analyzed'], key="profile")
+
+    # Manual mode lives outside the scrape branch, so its button never re-triggers a scan
+    with st.expander("🛠️ Modo Manual (Salva-vidas)", expanded=st.session_state.get('scrape_failed', False)):
+        st.info("Não se preocupe! Você ainda pode analisar o perfil colando os tweets abaixo:")
+        manual_text = st.text_area("Cole os tweets aqui (um por linha):", height=200)
+        
+        if st.button("Analisar Texto Manual"):
+            lines = [line.strip() for line in manual_text.split('\n') if line.strip()]
+            if not model:
+                st.error("Erro: Modelo não encontrado.")
+            elif lines:
+                # Simulate dataframe
                 try:
-                    df_tweets = run_scrape(target_user, auth_info, cookies_file_path)
-                    
-                    if df_tweets is None or df_tweets.empty:
-                        status.update(label="Erro no Login/Busca", state="error")
-                        st.error("⚠️ O Twitter/X bloqueou o acesso automático (Cloudflare Block). Isso é comum em ferramentas de scraping.")
-                        
-                        st.markdown("### 🛠️ Modo Manual (Salva-vidas)")
-                        st.info("Não se preocupe! Você ainda pode analisar o perfil colando os tweets abaixo:")
-                        manual_text = st.text_area("Cole os tweets aqui (um por linha):", height=200)
-                        
-                        if st.button("Analisar Texto Manual"):
-                            lines = [line.strip() for line in manual_text.split('\n') if line.strip()]
-                            if lines:
-                                # Simulate dataframe
-                                df_analyzed = analyze_profile(pd.DataFrame({'text': lines}), model)
-                                
-                                # --- RESULTS DASHBOARD REPEATED (Manual Mode) ---
-                                st.divider()
-                                
-                                counts = df_analyzed['prediction'].value_counts()
-                                total_tweets = len(df_analyzed)
-                                
-                                # Risk Logic
-                                if 'Suicidal' in counts and counts['Suicidal'] > 0:
-                                    most_common = "⚠️ Risco de Suicídio Detectado"
-                                    st.error("🚨 ALERTA: Conteúdo indica Comportamento Suicida.")
-                                elif 'Depression' in counts and (counts['Depression'] / total_tweets > 0.15):
-                                    most_common = "Depressão"
-                                else:
-                                    most_common = df_analyzed['prediction'].mode()[0]
-                                
-                                m1, m2 = st.columns(2)
-                                m1.metric("Diagnóstico Sugerido", most_common)
-                                m2.metric("Confiança Média", f"{df_analyzed['probability'].mean():.1%}")
-                                
-                                c1, c2 = st.columns(2)
-                                c1.plotly_chart(px.pie(df_analyzed, names='prediction', title="Distribuição",
-                                     color='prediction',
-                                     color_discrete_map={
-                                         "Normal": "#2ecc71",
-                                         "Suicidal": "#e74c3c",
-                                         "Depression": "#e67e22", 
-                                         "Anxiety": "#f1c40f"
-                                     }), use_container_width=True)
-                                c2.dataframe(df_analyzed)
-                            else:
-                                st.warning("Cole algo!")
-                    else:
-                        status.update(label="Sucesso!", state="complete")
-                        st.success(f"Baixados {len(df_tweets)} tweets de @{target_user}.")
-                        
-                        # Analyze
-                        df_analyzed = analyze_profile(df_tweets, model)
-                        
-                        # Dashboard
-                        st.divider()
-                        
-                      # --- RESULTS DASHBOARD ---
-                    st.divider()
-                    
-                    # 1. Overview Metrics (With Severity Logic)
-                    # Priority: Suicidal > Depression > Bipolar > Anxiety > Normal
-                    counts = df_analyzed['prediction'].value_counts()
-                    total_tweets = len(df_analyzed)
-                    
-                    # Risk Detection Logic
-                    if 'Suicidal' in counts and counts['Suicidal'] > 0:
-                        most_common = "⚠️ Risco de Suicídio Detectado"
-                        st.error("🚨 ALERTA: Este perfil contém indícios de Comportamento Suicida.")
-                    elif 'Depression' in counts and (counts['Depression'] / total_tweets > 0.15): # If > 15% depression
-                        most_common = "Depressão (Tendência Dominante)"
-                    elif 'Anxiety' in counts and (counts['Anxiety'] / total_tweets > 0.15):
-                         most_common = "Ansiedade (Tendência Dominante)"
-                    else:
-                        most_common = df_analyzed['prediction'].mode()[0]
-
-                    avg_prob = df_analyzed['probability'].mean()
-                    
-                    m1, m2, m3 = st.columns(3)
-                    m1.metric("Tweets Analisados", total_tweets)
-                    m2.metric("Diagnóstico do Perfil", most_common)
-                    m3.metric("Confiança Média", f"{avg_prob:.1%}")
-                    
-                    # 2. Breakdown Chart
-                    st.subheader("Distribuição de Sentimentos")
-                    counts_df = counts.reset_index()
-                    counts_df.columns = ['Categoria', 'Contagem']
-                    fig_pie = px.pie(counts_df, values='Contagem', names='Categoria', hole=0.4, 
-                                     color='Categoria',
-                                     color_discrete_map={
-                                         "Normal": "#2ecc71",
-                                         "Suicidal": "#e74c3c",
-                                         "Depression": "#e67e22",
-                                         "Anxiety": "#f1c40f",
-                                         "Bipolar": "#9b59b6",
-                                         "Stress": "#34495e"
-                                     })
-                    st.plotly_chart(fig_pie, use_container_width=True)
-                        
-                    # Display raw data
-                    st.subheader("Tweets Analisados")
-                    if 'date' in df_analyzed.columns:
-                        st.dataframe(df_analyzed[['date', 'original_text', 'prediction']])
-                            
+                    st.session_state['manual_result'] = profile_cache.get_or_compute(
+                        text_key("\n".join(lines), model_version),
+                        lambda: analyze_profile(pd.DataFrame({'text': lines}), model, class_probabilities=True)
+                    )
                 except Exception as e:
-                    status.update(label="Erro Crítico", state="error")
-                    st.error(f"Ocorreu um erro: {e}")
+                    st.error(f"Erro na análise: {e}")
+            else:
+                st.warning("Cole algo!")
+
+        manual_result = st.session_state.get('manual_result')
+        if manual_result is not None:
+            render_dashboard(manual_result, key="manual")